@@ -0,0 +1,32 @@
+"""comments thread index
+
+Revision ID: 4c8e2f6a9d71
+Revises: d27f3b8e6a15
+Create Date: 2026-10-18 20:12:45.118342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c8e2f6a9d71"
+down_revision: Union[str, Sequence[str], None] = "d27f3b8e6a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_comments_blog_parent_created",
+        "comments",
+        ["blog_id", "parent_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_comments_blog_parent_created", table_name="comments")
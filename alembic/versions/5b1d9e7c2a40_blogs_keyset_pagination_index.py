@@ -0,0 +1,28 @@
+"""blogs keyset pagination index
+
+Revision ID: 5b1d9e7c2a40
+Revises: 18fd6ff2481a
+Create Date: 2026-10-18 19:30:12.412088
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1d9e7c2a40"
+down_revision: Union[str, Sequence[str], None] = "18fd6ff2481a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_blogs_created_at_id", "blogs", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_blogs_created_at_id", table_name="blogs")
@@ -0,0 +1,67 @@
+"""denormalized like counters
+
+Revision ID: 7a3c5e9b1f24
+Revises: 4c8e2f6a9d71
+Create Date: 2026-10-18 20:31:19.640257
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3c5e9b1f24"
+down_revision: Union[str, Sequence[str], None] = "4c8e2f6a9d71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "blogs",
+        sa.Column(
+            "likes_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column(
+        "comments",
+        sa.Column(
+            "likes_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.execute(
+        "UPDATE blogs SET likes_count = "
+        "(SELECT count(*) FROM blog_likes WHERE blog_likes.blog_id = blogs.id)"
+    )
+    op.execute(
+        "UPDATE comments SET likes_count = "
+        "(SELECT count(*) FROM comment_likes WHERE comment_likes.comment_id = comments.id)"
+    )
+    op.create_index(
+        "ix_comments_blog_parent_likes",
+        "comments",
+        ["blog_id", "parent_id", "likes_count"],
+    )
+    op.create_index(
+        "ix_blog_likes_blog_created",
+        "blog_likes",
+        ["blog_id", "created_at", "user_id"],
+    )
+    op.create_index(
+        "ix_comment_likes_comment_created",
+        "comment_likes",
+        ["comment_id", "created_at", "user_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_comment_likes_comment_created", table_name="comment_likes")
+    op.drop_index("ix_blog_likes_blog_created", table_name="blog_likes")
+    op.drop_index("ix_comments_blog_parent_likes", table_name="comments")
+    op.drop_column("comments", "likes_count")
+    op.drop_column("blogs", "likes_count")
@@ -0,0 +1,70 @@
+"""blog excerpts
+
+Revision ID: 9e4a6c1f8b32
+Revises: 5b1d9e7c2a40
+Create Date: 2026-10-18 19:41:37.905114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4a6c1f8b32"
+down_revision: Union[str, Sequence[str], None] = "5b1d9e7c2a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the excerpt rule as of this revision, see utils.text.make_excerpt
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH) -> str:
+    text = " ".join(content.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:!?-") + "…"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("blogs", sa.Column("excerpt", sa.String(length=210), nullable=True))
+
+    blogs = sa.table(
+        "blogs",
+        sa.column("id", sa.Integer),
+        sa.column("content", sa.Text),
+        sa.column("excerpt", sa.String),
+    )
+    connection = op.get_bind()
+    update = (
+        blogs.update()
+        .where(blogs.c.id == sa.bindparam("b_id"))
+        .values(excerpt=sa.bindparam("b_excerpt"))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(blogs.c.id, blogs.c.content)
+            .where(blogs.c.id > last_id)
+            .order_by(blogs.c.id)
+            .limit(1000)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            update,
+            [{"b_id": r.id, "b_excerpt": make_excerpt(r.content)} for r in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("blogs", "excerpt")
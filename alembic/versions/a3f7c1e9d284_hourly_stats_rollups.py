@@ -0,0 +1,58 @@
+"""hourly stats rollups
+
+Revision ID: a3f7c1e9d284
+Revises: e58d2c7a4b93
+Create Date: 2026-10-18 23:48:05.917342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f7c1e9d284"
+down_revision: Union[str, Sequence[str], None] = "e58d2c7a4b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stats_rollups",
+        sa.Column("metric", sa.String(length=32), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("value", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("metric", "bucket_start"),
+    )
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("metric", sa.String(length=32), nullable=False),
+        sa.Column("rolled_until", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("metric"),
+    )
+    op.create_index(op.f("ix_users_created_at"), "users", ["created_at"])
+    op.create_index(op.f("ix_comments_created_at"), "comments", ["created_at"])
+    op.create_index("ix_blog_likes_created_at", "blog_likes", ["created_at"])
+    op.create_index("ix_comment_likes_created_at", "comment_likes", ["created_at"])
+    op.create_index(
+        op.f("ix_flagged_blogs_created_at"), "flagged_blogs", ["created_at"]
+    )
+    op.create_index(
+        op.f("ix_flagged_comments_created_at"), "flagged_comments", ["created_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_flagged_comments_created_at"), table_name="flagged_comments")
+    op.drop_index(op.f("ix_flagged_blogs_created_at"), table_name="flagged_blogs")
+    op.drop_index("ix_comment_likes_created_at", table_name="comment_likes")
+    op.drop_index("ix_blog_likes_created_at", table_name="blog_likes")
+    op.drop_index(op.f("ix_comments_created_at"), table_name="comments")
+    op.drop_index(op.f("ix_users_created_at"), table_name="users")
+    op.drop_table("rollup_watermarks")
+    op.drop_table("stats_rollups")
@@ -0,0 +1,80 @@
+"""blog comments version
+
+Revision ID: b1e7c4d9a205
+Revises: f2b8d4a6c013
+Create Date: 2026-10-19 03:05:12.640187
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b1e7c4d9a205"
+down_revision: Union[str, Sequence[str], None] = "f2b8d4a6c013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BUMP_SQL = "UPDATE blogs SET comments_version = comments_version + 1 WHERE id = {}"
+
+SQLITE_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS comments_version_ai AFTER INSERT ON comments "
+    f"BEGIN {BUMP_SQL.format('new.blog_id')}; END",
+    "CREATE TRIGGER IF NOT EXISTS comments_version_au AFTER UPDATE ON comments "
+    f"BEGIN {BUMP_SQL.format('old.blog_id')}; "
+    f"{BUMP_SQL.format('new.blog_id')} AND new.blog_id IS NOT old.blog_id; END",
+    "CREATE TRIGGER IF NOT EXISTS comments_version_ad AFTER DELETE ON comments "
+    f"BEGIN {BUMP_SQL.format('old.blog_id')}; END",
+]
+
+POSTGRES_DDL = [
+    "CREATE OR REPLACE FUNCTION comments_version_bump() RETURNS trigger AS $$ "
+    "BEGIN "
+    "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+    f"{BUMP_SQL.format('OLD.blog_id')}; "
+    "END IF; "
+    "IF TG_OP = 'INSERT' OR "
+    "(TG_OP = 'UPDATE' AND NEW.blog_id IS DISTINCT FROM OLD.blog_id) THEN "
+    f"{BUMP_SQL.format('NEW.blog_id')}; "
+    "END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS comments_version ON comments",
+    "CREATE TRIGGER comments_version AFTER INSERT OR UPDATE OR DELETE ON comments "
+    "FOR EACH ROW EXECUTE FUNCTION comments_version_bump()",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "blogs",
+        sa.Column(
+            "comments_version",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS comments_version ON comments")
+        op.execute("DROP FUNCTION IF EXISTS comments_version_bump()")
+    elif dialect == "sqlite":
+        for trigger in ("ai", "au", "ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS comments_version_{trigger}")
+    op.drop_column("blogs", "comments_version")
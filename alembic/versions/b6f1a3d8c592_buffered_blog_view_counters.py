@@ -0,0 +1,43 @@
+"""buffered blog view counters
+
+Revision ID: b6f1a3d8c592
+Revises: 7a3c5e9b1f24
+Create Date: 2026-10-18 20:52:41.337915
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6f1a3d8c592"
+down_revision: Union[str, Sequence[str], None] = "7a3c5e9b1f24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "blogs",
+        sa.Column(
+            "view_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column(
+        "blogs",
+        sa.Column(
+            "unique_viewers", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column("blogs", sa.Column("viewer_sketch", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("blogs", "viewer_sketch")
+    op.drop_column("blogs", "unique_viewers")
+    op.drop_column("blogs", "view_count")
@@ -0,0 +1,101 @@
+"""blog hot score
+
+Revision ID: c9d4e2b7f615
+Revises: a3f7c1e9d284
+Create Date: 2026-10-19 00:26:41.203518
+
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c9d4e2b7f615"
+down_revision: Union[str, Sequence[str], None] = "a3f7c1e9d284"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the hot score formula as of this revision, see utils.trending.hot_score
+HALF_LIFE_HOURS = 12.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+VIEWER_WEIGHT = 0.1
+SCORE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def hot_score(likes, comments, viewers, created_at) -> float:
+    engagement = (
+        LIKE_WEIGHT * likes + COMMENT_WEIGHT * comments + VIEWER_WEIGHT * viewers
+    )
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (created_at - SCORE_EPOCH).total_seconds()
+    return math.log2(1 + engagement) + age / (HALF_LIFE_HOURS * 3600)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "blogs",
+        sa.Column("hot_score", sa.Float(), server_default=sa.text("0"), nullable=False),
+    )
+    op.create_index("ix_blogs_hot_score_id", "blogs", ["hot_score", "id"])
+
+    blogs = sa.table(
+        "blogs",
+        sa.column("id", sa.Integer),
+        sa.column("likes_count", sa.Integer),
+        sa.column("unique_viewers", sa.Integer),
+        sa.column("created_at", sa.DateTime),
+        sa.column("hot_score", sa.Float),
+    )
+    comments = sa.table(
+        "comments", sa.column("id", sa.Integer), sa.column("blog_id", sa.Integer)
+    )
+    comment_count = (
+        sa.select(sa.func.count(comments.c.id))
+        .where(comments.c.blog_id == blogs.c.id)
+        .correlate(blogs)
+        .scalar_subquery()
+    )
+    connection = op.get_bind()
+    update = (
+        blogs.update()
+        .where(blogs.c.id == sa.bindparam("b_id"))
+        .values(hot_score=sa.bindparam("b_score"))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(
+                blogs.c.id,
+                blogs.c.likes_count,
+                comment_count,
+                blogs.c.unique_viewers,
+                blogs.c.created_at,
+            )
+            .where(blogs.c.id > last_id)
+            .order_by(blogs.c.id)
+            .limit(1000)
+        ).all()
+        if not rows:
+            break
+        params = [
+            {"b_id": blog_id, "b_score": hot_score(likes, count, viewers, created_at)}
+            for blog_id, likes, count, viewers, created_at in rows
+            if created_at is not None
+        ]
+        if params:
+            connection.execute(update, params)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_blogs_hot_score_id", table_name="blogs")
+    op.drop_column("blogs", "hot_score")
@@ -0,0 +1,68 @@
+"""blog full text search
+
+Revision ID: d27f3b8e6a15
+Revises: 9e4a6c1f8b32
+Create Date: 2026-10-18 19:58:04.226351
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d27f3b8e6a15"
+down_revision: Union[str, Sequence[str], None] = "9e4a6c1f8b32"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the search DDL as of this revision, see models.blog_search
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(blogs.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(blogs.content, '')), 'B')"
+)
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_blogs_search ON blogs USING GIN (({SEARCH_VECTOR_SQL}))",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5("
+    "title, content, content='blogs', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN "
+    "INSERT INTO blogs_fts(rowid, title, content) "
+    "VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN "
+    "INSERT INTO blogs_fts(blogs_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, content ON blogs BEGIN "
+    "INSERT INTO blogs_fts(blogs_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO blogs_fts(rowid, title, content) "
+    "VALUES (new.id, new.title, new.content); END",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # index the rows that existed before the triggers
+        op.execute("INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_blogs_search")
+    elif dialect == "sqlite":
+        for trigger in ("blogs_fts_ai", "blogs_fts_ad", "blogs_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS blogs_fts")
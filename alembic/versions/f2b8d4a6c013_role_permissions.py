@@ -0,0 +1,54 @@
+"""role permissions
+
+Revision ID: f2b8d4a6c013
+Revises: c9d4e2b7f615
+Create Date: 2026-10-19 02:14:08.351926
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b8d4a6c013"
+down_revision: Union[str, Sequence[str], None] = "c9d4e2b7f615"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the permission bits and built-in grants as of this revision, see models.role
+MANAGE_ROLES = 1
+VIEW_STATS = 2
+MODERATE = 4
+PUBLISH = 8
+COMMENT = 16
+FLAG = 32
+
+DEFAULT_ROLE_PERMISSIONS = {
+    "admin": MANAGE_ROLES | VIEW_STATS | MODERATE | COMMENT,
+    "guest": 0,
+    "moderator": MODERATE | COMMENT | FLAG,
+    "author": PUBLISH | COMMENT | FLAG,
+    "user": COMMENT | FLAG,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("roles", sa.Column("permissions", sa.Integer(), nullable=True))
+    roles = sa.table(
+        "roles", sa.column("role_name", sa.String), sa.column("permissions", sa.Integer)
+    )
+    for role_name, permissions in DEFAULT_ROLE_PERMISSIONS.items():
+        op.execute(
+            roles.update()
+            .where(roles.c.role_name == role_name)
+            .values(permissions=permissions)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("roles", "permissions")
@@ -0,0 +1,194 @@
+"""Mixed read/write load against the sync and the async (DB_ASYNC) stack.
+
+Seeds a throwaway database, then for each mode starts ``uvicorn main:app``
+on it and fires ``--requests`` requests with ``--concurrency`` in flight:
+blog lists, single blogs, comment pages and trending, plus like toggles for
+``--write-ratio`` of the requests. Prints throughput and latency
+percentiles per mode.
+
+    python benchmarks/async_load.py --requests 5000 --concurrency 200
+
+Set DATABASE_URL to benchmark against Postgres instead of a temporary
+SQLite file; its tables are created and seeded, so use a scratch database.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(database_url: str, blogs: int, users: int) -> tuple:
+    """Create the schema and sample data; returns user tokens and blog ids."""
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from config.base import Base
+    from models import Blog, Comment, Role, User
+    from utils.hashing import create_access_token
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine, expire_on_commit=False) as db:
+        if not db.query(Role).count():
+            for role_id, name in enumerate(
+                ["admin", "guest", "moderator", "author", "user"], start=1
+            ):
+                db.add(Role(id=role_id, role_name=name))
+            db.flush()
+        accounts = [
+            User(email=f"bench{i}@example.com", password="-", name="bench", role_id=4)
+            for i in range(users)
+        ]
+        db.add_all(accounts)
+        db.flush()
+        posts = [
+            Blog(
+                title=f"post {i}", content="lorem ipsum " * 200, owner_id=accounts[0].id
+            )
+            for i in range(blogs)
+        ]
+        db.add_all(posts)
+        db.flush()
+        db.add_all(
+            Comment(content="nice", owner_id=accounts[i % users].id, blog_id=post.id)
+            for i, post in enumerate(posts * 5)
+        )
+        db.commit()
+        tokens = [
+            create_access_token(account.id, account.email, "author")[0]
+            for account in accounts
+        ]
+        blog_ids = [post.id for post in posts]
+    engine.dispose()
+    return tokens, blog_ids
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, **settings: str):
+    env = {**os.environ, "DATABASE_URL": database_url, **settings}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def run_load(base_url, tokens, blog_ids, total, concurrency, write_ratio):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        await wait_ready(client)
+        latencies, errors = [], 0
+        remaining = iter(range(total))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                blog_id = random.choice(blog_ids)
+                if random.random() < write_ratio:
+                    request = client.post(
+                        f"/blogs/{blog_id}/like",
+                        headers={"Authorization": f"Bearer {random.choice(tokens)}"},
+                    )
+                else:
+                    path = random.choice(
+                        [
+                            "/blogs/",
+                            f"/blogs/{blog_id}",
+                            f"/blogs/{blog_id}/comments",
+                            "/blogs/trending",
+                        ]
+                    )
+                    request = client.get(path)
+                started = time.perf_counter()
+                response = await request
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, errors
+
+
+def report(mode, elapsed, latencies, errors):
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"{mode:>5}  {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {cuts[49] * 1000:7.1f} ms  p95 {cuts[94] * 1000:7.1f} ms  "
+        f"p99 {cuts[98] * 1000:7.1f} ms  errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--blogs", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        workdir = tempfile.mkdtemp(prefix="blog-bench-")
+        database_url = f"sqlite+pysqlite:///{workdir}/bench.db"
+    tokens, blog_ids = seed(database_url, args.blogs, args.users)
+
+    for mode, use_async in (("sync", False), ("async", True)):
+        port = free_port()
+        server = start_server(
+            database_url, port, DB_ASYNC="true" if use_async else "false"
+        )
+        try:
+            result = asyncio.run(
+                run_load(
+                    f"http://127.0.0.1:{port}",
+                    tokens,
+                    blog_ids,
+                    args.requests,
+                    args.concurrency,
+                    args.write_ratio,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        report(mode, *result)
+
+
+if __name__ == "__main__":
+    main()
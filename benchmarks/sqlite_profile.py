@@ -0,0 +1,51 @@
+"""Write-heavy load against the default and the tuned SQLite profile.
+
+Same harness as async_load.py, run once per SQLITE_PROFILE on a fresh
+SQLite file each time; a higher ``--write-ratio`` makes lock contention
+visible. With the default profile concurrent writers show up as errors
+("database is locked"), with the tuned one they queue on the writer.
+
+    python benchmarks/sqlite_profile.py --requests 3000 --write-ratio 0.5
+"""
+
+import argparse
+import asyncio
+import tempfile
+
+from async_load import free_port, report, run_load, seed, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--write-ratio", type=float, default=0.5)
+    parser.add_argument("--blogs", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="blog-sqlite-bench-")
+    for profile in ("default", "tuned"):
+        database_url = f"sqlite+pysqlite:///{workdir}/{profile}.db"
+        tokens, blog_ids = seed(database_url, args.blogs, args.users)
+        port = free_port()
+        server = start_server(database_url, port, SQLITE_PROFILE=profile)
+        try:
+            result = asyncio.run(
+                run_load(
+                    f"http://127.0.0.1:{port}",
+                    tokens,
+                    blog_ids,
+                    args.requests,
+                    args.concurrency,
+                    args.write_ratio,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        report(profile, *result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,193 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
 import os
+import random
 from dotenv import load_dotenv
 
+from config.sqlite import SQLITE_PROFILE, SQLITE_READERS, tune_sqlite
+from utils.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from utils.request_context import current_request
+from utils.slow_queries import SlowQueryLog
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# comma separated, e.g. two sqlite files or streaming replicas of the primary
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+# serve the read-heavy blog routes from an async engine (asyncpg / aiosqlite)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
 
 if not DATABASE_URL:
     DATABASE_URL = "sqlite+pysqlite:///./blog_platform_api.db"
-    connect_args = {"check_same_thread": False}
-else:
-    connect_args = {}
 
-engine = create_engine(DATABASE_URL, pool_size=5, connect_args=connect_args)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# seconds after which a connection is replaced, -1 to keep connections forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", -1))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# statements slower than this are logged and explained, 0 turns it off
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", 100))
+
+
+# single node SQLite: one serialized writer connection plus a reader pool
+SQLITE_TUNED = (
+    SQLITE_PROFILE == "tuned" and make_url(DATABASE_URL).get_backend_name() == "sqlite"
+)
+WRITER_POOL = {"pool_size": 1, "max_overflow": 0} if SQLITE_TUNED else {}
+
+
+def connect_args_for(url: str) -> dict:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {}
+
+
+def pool_options(name: str, poolclass=InstrumentedQueuePool, **overrides) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        # names the pool in logs and /admin/db/pool
+        "pool_logging_name": name,
+        **overrides,
+    }
+
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args_for(DATABASE_URL),
+    **pool_options("primary", **WRITER_POOL),
+)
+replica_engines = [
+    create_engine(
+        url, connect_args=connect_args_for(url), **pool_options(f"replica-{index}")
+    )
+    for index, url in enumerate(DATABASE_REPLICA_URLS)
+]
+if SQLITE_TUNED:
+    sqlite_readers = create_engine(
+        DATABASE_URL,
+        connect_args=connect_args_for(DATABASE_URL),
+        **pool_options("sqlite-readers", pool_size=SQLITE_READERS),
+    )
+    tune_sqlite(engine, writer=True)
+    tune_sqlite(sqlite_readers, writer=False)
+    replica_engines.insert(0, sqlite_readers)
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_BUFFER)
+# plans are captured on a reader when there is one, keeping the writer free
+explain_engine = replica_engines[0] if replica_engines else engine
+for slow_query_engine in [engine, *replica_engines]:
+    slow_query_log.install(slow_query_engine, explain_engine)
+
+
+class RoutingSession(Session):
+    """Session that serves the reads of read-only requests from a replica.
+
+    A replica is only used while the current request is read-only (see
+    utils.request_context) and this session has not written anything; flushes,
+    DML statements and everything after them, as well as work outside a
+    request such as the background jobs, go to the primary. A session sticks
+    to one replica so the queries of a request see a single snapshot.
+
+    With ``local_readers`` the replicas read the primary's own storage (the
+    tuned SQLite profile), so they can never be behind: every read up to the
+    first write uses them, keeping the single writer connection free until a
+    session actually writes.
+    """
+
+    def __init__(self, *args, replicas=(), local_readers=False, **kw):
+        super().__init__(*args, **kw)
+        self.replicas = list(replicas)
+        self.local_readers = local_readers
+        self._replica = None
+        self._wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replicas and not self._wrote:
+            if self._flushing or getattr(clause, "is_dml", False):
+                self._wrote = True
+            else:
+                context = current_request.get()
+                if self.local_readers or (context is not None and context.read_only):
+                    if self._replica is None:
+                        self._replica = random.choice(self.replicas)
+                    return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+SessionLocal = sessionmaker(
+    bind=engine,
+    class_=RoutingSession,
+    replicas=replica_engines,
+    local_readers=SQLITE_TUNED,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(url: str) -> str:
+    """``url`` with its driver swapped for the async one of the same backend."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    async_engine = create_async_engine(
+        async_url(DATABASE_URL),
+        **pool_options("async-primary", InstrumentedAsyncQueuePool, **WRITER_POOL),
+    )
+    async_replica_engines = [
+        create_async_engine(
+            async_url(url),
+            **pool_options(f"async-replica-{index}", InstrumentedAsyncQueuePool),
+        )
+        for index, url in enumerate(DATABASE_REPLICA_URLS)
+    ]
+    if SQLITE_TUNED:
+        async_sqlite_readers = create_async_engine(
+            async_url(DATABASE_URL),
+            **pool_options(
+                "async-sqlite-readers",
+                InstrumentedAsyncQueuePool,
+                pool_size=SQLITE_READERS,
+            ),
+        )
+        tune_sqlite(async_engine, writer=True)
+        tune_sqlite(async_sqlite_readers, writer=False)
+        async_replica_engines.insert(0, async_sqlite_readers)
+    for slow_query_engine in [async_engine, *async_replica_engines]:
+        slow_query_log.install(slow_query_engine, explain_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        sync_session_class=RoutingSession,
+        replicas=[replica.sync_engine for replica in async_replica_engines],
+        local_readers=SQLITE_TUNED,
+        autoflush=False,
+        expire_on_commit=False,
+    )
@@ -0,0 +1,53 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+
+# "tuned": WAL, one serialized writer connection plus a pool of readers
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+SQLITE_READERS = int(os.getenv("SQLITE_READERS", 4))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+# negative values are KiB, so 64 MiB of page cache per connection
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))
+
+TUNED_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}",
+    f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def tune_sqlite(engine, writer: bool) -> None:
+    """Apply the tuned pragmas to every connection ``engine`` opens.
+
+    The writer takes the write lock as soon as its transaction begins
+    (BEGIN IMMEDIATE), so two writers queue on busy_timeout instead of
+    failing with "database is locked" when a read lock cannot be upgraded.
+    Reader connections are query_only and read from one snapshot per
+    transaction. ``engine`` may be a sync or an async engine.
+    """
+    engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        # let SQLAlchemy's begin event, not the driver, open transactions
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in TUNED_PRAGMAS:
+            cursor.execute(pragma)
+        if not writer:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    begin = "BEGIN IMMEDIATE" if writer else "BEGIN"
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql(begin)
@@ -1,24 +1,63 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routes.test import router as test_router
 from routes.user import router as user_login_router
 from routes.role import router as role_router
 from routes.blog import router as blog_router, comment_router
+from routes.blog_async import router as async_blog_router
 from routes.moderation import router as moderation_router
 from routes.admin import router as admin_router
+from routes.metrics import router as metrics_router
 import models
 from config.base import Base
-from config.session import engine
+from config.session import (
+    DATABASE_REPLICA_URLS,
+    DB_ASYNC,
+    async_engine,
+    engine,
+    slow_query_log,
+)
+from utils.hashing import hashing_pool
+from utils.metrics import MetricsMiddleware
+from utils.permissions import role_registry
+from utils.query_stats import QueryStatsMiddleware
+from utils.request_context import RequestContextMiddleware
+from utils.rollups import rollup_job
+from utils.views import view_counter
 
 Base.metadata.create_all(bind=engine)
-app = FastAPI()
 
-app.include_router(test_router)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    role_registry.reload()
+    hashing_pool.start()
+    view_counter.start()
+    rollup_job.start()
+    yield
+    rollup_job.stop()
+    # persist buffered views before the process exits
+    view_counter.stop()
+    hashing_pool.shutdown()
+    slow_query_log.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(RequestContextMiddleware, pin_writes=bool(DATABASE_REPLICA_URLS))
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(user_login_router)
 app.include_router(role_router)
+if DB_ASYNC:
+    # registered first so it takes precedence over the sync routes it mirrors
+    app.include_router(async_blog_router)
 app.include_router(blog_router)
 app.include_router(comment_router)
 app.include_router(moderation_router)
 app.include_router(admin_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -2,18 +2,25 @@ from .user import User
 from .role import Role
 from .blog import Blog
 from .blog_like import blog_likes as BlogLike
+from .blog_search import blogs_fts as BlogSearch
 from .flagged_blog import FlaggedBlog
 from .comment import Comment
 from .comment_like import comment_likes as CommentLike
 from .flagged_comment import FlaggedComment
+from .platform_counter import PlatformCounter
+from .stats_rollup import StatsRollup, RollupWatermark
 
 __all__ = [
     "User",
     "Role",
     "Blog",
     "BlogLike",
+    "BlogSearch",
     "FlaggedBlog",
     "Comment",
     "CommentLike",
     "FlaggedComment",
+    "PlatformCounter",
+    "StatsRollup",
+    "RollupWatermark",
 ]
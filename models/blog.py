@@ -1,6 +1,16 @@
 from config.base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, text, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    text,
+    DateTime,
+    ForeignKey,
+    Text,
+    Index,
+    LargeBinary,
+)
 from datetime import datetime
 from .blog_like import blog_likes
 from typing import TYPE_CHECKING
@@ -15,12 +25,35 @@ class Blog(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(120), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    excerpt: Mapped[str] = mapped_column(String(210), nullable=True)
     main_image_url: Mapped[str] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    likes_count: Mapped[int] = mapped_column(
+        Integer, server_default=text("0"), nullable=False
+    )
+    view_count: Mapped[int] = mapped_column(
+        Integer, server_default=text("0"), nullable=False
+    )
+    unique_viewers: Mapped[int] = mapped_column(
+        Integer, server_default=text("0"), nullable=False
+    )
+    # time-decayed engagement, see utils.trending
+    hot_score: Mapped[float] = mapped_column(
+        Float, server_default=text("0"), nullable=False
+    )
+    # bumped by triggers on every comment write (including like counts), so
+    # it versions the blog's comment lists; see models.comment
+    comments_version: Mapped[int] = mapped_column(
+        Integer, server_default=text("0"), nullable=False, deferred=True
+    )
+    # HyperLogLog registers behind unique_viewers, only read by the view flusher
+    viewer_sketch: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=True, deferred=True
+    )
 
     owner: Mapped["User"] = relationship("User", back_populates="blogs")
     likes = relationship("User", secondary=blog_likes, back_populates="liked_blogs")
@@ -30,3 +63,8 @@ class Blog(Base):
     comments = relationship(
         "Comment", back_populates="blog", cascade="all, delete-orphan"
     )
+
+    __table_args__ = (
+        Index("ix_blogs_created_at_id", "created_at", "id"),
+        Index("ix_blogs_hot_score_id", "hot_score", "id"),
+    )
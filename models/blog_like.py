@@ -1,5 +1,5 @@
 from config.base import Base
-from sqlalchemy import text, DateTime, ForeignKey, Table, Column
+from sqlalchemy import text, DateTime, ForeignKey, Table, Column, Index
 
 
 blog_likes = Table(
@@ -10,4 +10,6 @@ blog_likes = Table(
     Column(
         "created_at", DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
     ),
+    Index("ix_blog_likes_blog_created", "blog_id", "created_at", "user_id"),
+    Index("ix_blog_likes_created_at", "created_at"),
 )
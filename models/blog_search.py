@@ -0,0 +1,41 @@
+from sqlalchemy import DDL, column, event, literal_column, table
+from .blog import Blog
+
+# Postgres: expression GIN index, kept current by the database on every write.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(blogs.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(blogs.content, '')), 'B')"
+)
+search_vector = literal_column(f"({SEARCH_VECTOR_SQL})")
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_blogs_search ON blogs USING GIN (({SEARCH_VECTOR_SQL}))",
+]
+
+# SQLite: external-content FTS5 table, kept current by triggers on blogs.
+blogs_fts = table("blogs_fts", column("rowid"), column("title"), column("content"))
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts USING fts5("
+    "title, content, content='blogs', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN "
+    "INSERT INTO blogs_fts(rowid, title, content) "
+    "VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN "
+    "INSERT INTO blogs_fts(blogs_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, content ON blogs BEGIN "
+    "INSERT INTO blogs_fts(blogs_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO blogs_fts(rowid, title, content) "
+    "VALUES (new.id, new.title, new.content); END",
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(
+        Blog.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Blog.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
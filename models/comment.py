@@ -1,6 +1,6 @@
 from config.base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, text, DateTime, ForeignKey
+from sqlalchemy import DDL, Integer, String, text, DateTime, ForeignKey, Index, event
 from datetime import datetime
 from typing import TYPE_CHECKING
 from .comment_like import comment_likes
@@ -20,6 +20,7 @@ class Comment(Base):
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
         nullable=False,
+        index=True,
     )
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -27,6 +28,9 @@ class Comment(Base):
     parent_id: Mapped[int] = mapped_column(
         ForeignKey("comments.id", ondelete="CASCADE"), nullable=True
     )
+    likes_count: Mapped[int] = mapped_column(
+        Integer, server_default=text("0"), nullable=False
+    )
 
     owner: Mapped["User"] = relationship("User", back_populates="comments")
     blog: Mapped["Blog"] = relationship("Blog", back_populates="comments")
@@ -46,3 +50,51 @@ class Comment(Base):
     flagged_comments = relationship(
         "FlaggedComment", back_populates="comment", cascade="all, delete-orphan"
     )
+
+    __table_args__ = (
+        Index("ix_comments_blog_parent_created", "blog_id", "parent_id", "created_at"),
+        Index("ix_comments_blog_parent_likes", "blog_id", "parent_id", "likes_count"),
+    )
+
+
+# Every insert, update and delete of a comment bumps blogs.comments_version,
+# whatever wrote it: routes, like toggles, moderation or cascades.
+_BUMP_SQL = "UPDATE blogs SET comments_version = comments_version + 1 WHERE id = {}"
+
+SQLITE_COMMENTS_VERSION_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS comments_version_ai AFTER INSERT ON comments "
+    f"BEGIN {_BUMP_SQL.format('new.blog_id')}; END",
+    "CREATE TRIGGER IF NOT EXISTS comments_version_au AFTER UPDATE ON comments "
+    f"BEGIN {_BUMP_SQL.format('old.blog_id')}; "
+    f"{_BUMP_SQL.format('new.blog_id')} AND new.blog_id IS NOT old.blog_id; END",
+    "CREATE TRIGGER IF NOT EXISTS comments_version_ad AFTER DELETE ON comments "
+    f"BEGIN {_BUMP_SQL.format('old.blog_id')}; END",
+]
+
+POSTGRES_COMMENTS_VERSION_DDL = [
+    "CREATE OR REPLACE FUNCTION comments_version_bump() RETURNS trigger AS $$ "
+    "BEGIN "
+    "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+    f"{_BUMP_SQL.format('OLD.blog_id')}; "
+    "END IF; "
+    "IF TG_OP = 'INSERT' OR "
+    "(TG_OP = 'UPDATE' AND NEW.blog_id IS DISTINCT FROM OLD.blog_id) THEN "
+    f"{_BUMP_SQL.format('NEW.blog_id')}; "
+    "END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS comments_version ON comments",
+    "CREATE TRIGGER comments_version AFTER INSERT OR UPDATE OR DELETE ON comments "
+    "FOR EACH ROW EXECUTE FUNCTION comments_version_bump()",
+]
+
+for statement in POSTGRES_COMMENTS_VERSION_DDL:
+    event.listen(
+        Comment.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+for statement in SQLITE_COMMENTS_VERSION_DDL:
+    event.listen(
+        Comment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
@@ -1,5 +1,5 @@
 from config.base import Base
-from sqlalchemy import text, DateTime, ForeignKey, Table, Column
+from sqlalchemy import text, DateTime, ForeignKey, Table, Column, Index
 
 comment_likes = Table(
     "comment_likes",
@@ -11,4 +11,6 @@ comment_likes = Table(
     Column(
         "created_at", DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
     ),
+    Index("ix_comment_likes_comment_created", "comment_id", "created_at", "user_id"),
+    Index("ix_comment_likes_created_at", "created_at"),
 )
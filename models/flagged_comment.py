@@ -12,6 +12,7 @@ class FlaggedComment(Base):
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
         nullable=False,
+        index=True,
     )
     comment_id: Mapped[int] = mapped_column(
         ForeignKey("comments.id", ondelete="CASCADE")
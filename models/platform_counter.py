@@ -0,0 +1,146 @@
+from config.base import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Integer, String, event, text
+
+# Totals are spread over a few shards so concurrent writers rarely contend
+# for the same counter row; readers sum the shards.
+COUNTER_SHARDS = 8
+
+# counter name -> table whose rows it counts
+COUNTED_TABLES = {
+    "users": "users",
+    "blogs": "blogs",
+    "blog_likes": "blog_likes",
+    "comments": "comments",
+    "comment_likes": "comment_likes",
+    "flagged_blogs": "flagged_blogs",
+    "flagged_comments": "flagged_comments",
+    "roles": "roles",
+}
+ROLE_COUNTER_PREFIX = "users.role."
+
+
+class PlatformCounter(Base):
+    __tablename__ = "platform_counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("0"), nullable=False
+    )
+
+
+def _bump_sql(name_sql: str, delta: int, shard_sql: str) -> str:
+    return (
+        "INSERT INTO platform_counters (name, shard, value) "
+        f"VALUES ({name_sql}, {shard_sql}, {delta}) "
+        "ON CONFLICT (name, shard) DO UPDATE "
+        f"SET value = platform_counters.value + ({delta})"
+    )
+
+
+def _sqlite_ddl() -> list:
+    shard = f"abs(random()) % {COUNTER_SHARDS}"
+    statements = []
+    for name, table in COUNTED_TABLES.items():
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS pc_{table}_ai AFTER INSERT ON {table} "
+            f"BEGIN {_bump_sql(repr(name), 1, shard)}; END",
+            f"CREATE TRIGGER IF NOT EXISTS pc_{table}_ad AFTER DELETE ON {table} "
+            f"BEGIN {_bump_sql(repr(name), -1, shard)}; END",
+        ]
+    new_role = f"'{ROLE_COUNTER_PREFIX}' || new.role_id"
+    old_role = f"'{ROLE_COUNTER_PREFIX}' || old.role_id"
+    statements += [
+        "CREATE TRIGGER IF NOT EXISTS pc_users_role_ai AFTER INSERT ON users "
+        f"BEGIN {_bump_sql(new_role, 1, shard)}; END",
+        "CREATE TRIGGER IF NOT EXISTS pc_users_role_ad AFTER DELETE ON users "
+        f"BEGIN {_bump_sql(old_role, -1, shard)}; END",
+        "CREATE TRIGGER IF NOT EXISTS pc_users_role_au AFTER UPDATE OF role_id ON users "
+        "WHEN old.role_id IS NOT new.role_id "
+        f"BEGIN {_bump_sql(old_role, -1, shard)}; {_bump_sql(new_role, 1, shard)}; END",
+    ]
+    return statements
+
+
+def _postgres_ddl() -> list:
+    shard = f"floor(random() * {COUNTER_SHARDS})::int"
+    new_role = f"'{ROLE_COUNTER_PREFIX}' || NEW.role_id"
+    old_role = f"'{ROLE_COUNTER_PREFIX}' || OLD.role_id"
+    statements = [
+        "CREATE OR REPLACE FUNCTION platform_counter_bump() RETURNS trigger AS $$ "
+        "BEGIN "
+        "IF TG_OP = 'INSERT' THEN "
+        f"{_bump_sql('TG_ARGV[0]', 1, shard)}; "
+        "ELSE "
+        f"{_bump_sql('TG_ARGV[0]', -1, shard)}; "
+        "END IF; "
+        "RETURN NULL; "
+        "END $$ LANGUAGE plpgsql",
+        "CREATE OR REPLACE FUNCTION platform_counter_users_by_role() "
+        "RETURNS trigger AS $$ "
+        "BEGIN "
+        "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+        f"{_bump_sql(old_role, -1, shard)}; "
+        "END IF; "
+        "IF TG_OP IN ('UPDATE', 'INSERT') THEN "
+        f"{_bump_sql(new_role, 1, shard)}; "
+        "END IF; "
+        "RETURN NULL; "
+        "END $$ LANGUAGE plpgsql",
+    ]
+    for name, table in COUNTED_TABLES.items():
+        statements += [
+            f"DROP TRIGGER IF EXISTS pc_{table} ON {table}",
+            f"CREATE TRIGGER pc_{table} AFTER INSERT OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION platform_counter_bump('{name}')",
+        ]
+    statements += [
+        "DROP TRIGGER IF EXISTS pc_users_role ON users",
+        "CREATE TRIGGER pc_users_role AFTER INSERT OR DELETE ON users "
+        "FOR EACH ROW EXECUTE FUNCTION platform_counter_users_by_role()",
+        "DROP TRIGGER IF EXISTS pc_users_role_update ON users",
+        "CREATE TRIGGER pc_users_role_update AFTER UPDATE OF role_id ON users "
+        "FOR EACH ROW WHEN (OLD.role_id IS DISTINCT FROM NEW.role_id) "
+        "EXECUTE FUNCTION platform_counter_users_by_role()",
+    ]
+    return statements
+
+
+def _seed_sql() -> list:
+    statements = ["DELETE FROM platform_counters"]
+    for name, table in COUNTED_TABLES.items():
+        statements.append(
+            "INSERT INTO platform_counters (name, shard, value) "
+            f"SELECT '{name}', 0, count(*) FROM {table}"
+        )
+    statements.append(
+        "INSERT INTO platform_counters (name, shard, value) "
+        f"SELECT '{ROLE_COUNTER_PREFIX}' || role_id, 0, count(*) "
+        "FROM users GROUP BY role_id"
+    )
+    return statements
+
+
+SQLITE_COUNTER_DDL = _sqlite_ddl()
+POSTGRES_COUNTER_DDL = _postgres_ddl()
+# rebuilds every counter from an exact COUNT over its table
+SEED_COUNTERS_SQL = _seed_sql()
+
+
+# The triggers reference the counted tables, so they are installed once the
+# whole metadata exists, and only when the counters table itself was just
+# created: the seed then counts whatever rows are already there.
+@event.listens_for(Base.metadata, "after_create")
+def _install_counters(target, connection, tables=(), **kw):
+    if PlatformCounter.__table__ not in tables:
+        return
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = POSTGRES_COUNTER_DDL
+    elif dialect == "sqlite":
+        statements = SQLITE_COUNTER_DDL
+    else:
+        statements = []
+    for statement in statements + SEED_COUNTERS_SQL:
+        connection.exec_driver_sql(statement)
@@ -2,12 +2,44 @@ from config.base import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import Integer, String, text, DateTime
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from enum import IntFlag
+from typing import List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .user import User
 
 
+class Permission(IntFlag):
+    MANAGE_ROLES = 1
+    VIEW_STATS = 2
+    MODERATE = 4
+    PUBLISH = 8
+    COMMENT = 16
+    FLAG = 32
+
+    @classmethod
+    def from_names(cls, names: List[str]) -> "Permission":
+        """Raises ``KeyError`` for a name that is not a permission."""
+        permission = cls(0)
+        for name in names:
+            permission |= cls[name]
+        return permission
+
+
+# what the built-in roles could do before permissions were stored per role
+DEFAULT_ROLE_PERMISSIONS = {
+    "admin": Permission.MANAGE_ROLES
+    | Permission.VIEW_STATS
+    | Permission.MODERATE
+    | Permission.COMMENT,
+    "guest": Permission(0),
+    "moderator": Permission.MODERATE | Permission.COMMENT | Permission.FLAG,
+    "author": Permission.PUBLISH | Permission.COMMENT | Permission.FLAG,
+    "user": Permission.COMMENT | Permission.FLAG,
+}
+DEFAULT_ROLE = "user"
+
+
 class Role(Base):
     __tablename__ = "roles"
 
@@ -16,5 +48,17 @@ class Role(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP")
     )
+    # NULL falls back to DEFAULT_ROLE_PERMISSIONS for the role's name
+    permissions: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     users: Mapped[List["User"]] = relationship("User", back_populates="role")
+
+    @property
+    def granted(self) -> Permission:
+        if self.permissions is None:
+            return DEFAULT_ROLE_PERMISSIONS.get(self.role_name, Permission(0))
+        return Permission(self.permissions)
+
+    @property
+    def permission_names(self) -> List[str]:
+        return [permission.name for permission in self.granted]
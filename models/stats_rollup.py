@@ -0,0 +1,29 @@
+from config.base import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Integer, String, text
+from datetime import datetime
+
+
+class StatsRollup(Base):
+    """Rows created per metric per UTC hour."""
+
+    __tablename__ = "stats_rollups"
+
+    metric: Mapped[str] = mapped_column(String(32), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    value: Mapped[int] = mapped_column(
+        Integer, server_default=text("0"), nullable=False
+    )
+
+
+class RollupWatermark(Base):
+    """How far each metric has been rolled up."""
+
+    __tablename__ = "rollup_watermarks"
+
+    metric: Mapped[str] = mapped_column(String(32), primary_key=True)
+    rolled_until: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
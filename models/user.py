@@ -25,6 +25,7 @@ class User(Base):
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
         nullable=False,
+        index=True,
     )
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     role_id: Mapped[int] = mapped_column(
@@ -1,57 +1,133 @@
-from fastapi import APIRouter, Depends
-from models import (
-    User,
-    Blog,
-    Comment,
-    BlogLike,
-    CommentLike,
-    FlaggedBlog,
-    FlaggedComment,
-    Role,
-)
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from models import User
+from models.role import Permission
 from sqlalchemy.orm import Session
 from database import get_db
-from schemas.admin import StatsResponse
-from utils.user import allowed_role
+from schemas.admin import StatsResponse, TimeSeriesResponse
+from utils.user import allowed_permission
+from config.session import (
+    async_engine,
+    async_replica_engines,
+    engine,
+    replica_engines,
+    slow_query_log,
+)
+from utils.cache import object_cache
+from utils.db_pool import pool_stats
+from utils.hashing import hashing_pool, token_cache
+from utils.permissions import role_registry
+from utils.principal import principal_cache
+from utils.counters import counter_stats, exact_stats
+from utils.rollups import DAY, HOUR, as_utc, read_series, rollup_job, utcnow
+from utils.views import view_counter
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+MAX_SERIES_POINTS = 24 * 92
+
 
 @router.get("/stats", response_model=StatsResponse)
 def get_stats(
-    db: Session = Depends(get_db), current_user: User = Depends(allowed_role("admin"))
+    exact: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
 ):
-    users = db.query(User).all()
-    user_count = len(users)
+    totals, users_by_role = exact_stats(db) if exact else counter_stats(db)
+    return StatsResponse(**totals, users_by_role=users_by_role)
+
 
-    blogs = db.query(Blog).all()
-    blog_count = len(blogs)
+@router.get("/stats/timeseries", response_model=TimeSeriesResponse)
+def get_stats_timeseries(
+    metric: Literal[
+        "users",
+        "blogs",
+        "comments",
+        "blog_likes",
+        "comment_likes",
+        "flagged_blogs",
+        "flagged_comments",
+    ],
+    bucket: Literal["hour", "day"] = "day",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    step = HOUR if bucket == "hour" else DAY
+    end = as_utc(end) if end else utcnow()
+    start = as_utc(start) if start else end - 30 * DAY
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'",
+        )
+    if (end - start) / step > MAX_SERIES_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large, at most {MAX_SERIES_POINTS} buckets",
+        )
 
-    blog_likes = db.query(BlogLike).all()
-    blog_likes_count = len(blog_likes)
+    points, rolled_until = read_series(db, metric, start, end, step)
+    return TimeSeriesResponse(
+        metric=metric,
+        bucket=bucket,
+        rolled_until=rolled_until,
+        points=[
+            {"bucket_start": bucket_start, "value": value}
+            for bucket_start, value in points
+        ],
+    )
 
-    comments = db.query(Comment).all()
-    comments_count = len(comments)
 
-    comment_likes = db.query(CommentLike).all()
-    comment_likes_count = len(comment_likes)
+@router.get("/rollups")
+def get_rollup_stats(
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    return rollup_job.stats()
 
-    flagged_blogs = db.query(FlaggedBlog).all()
-    flagged_blogs_count = len(flagged_blogs)
 
-    flagged_comments = db.query(FlaggedComment).all()
-    flagged_comments_count = len(flagged_comments)
+@router.get("/cache")
+def get_cache_stats(
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    return object_cache.stats()
 
-    roles = db.query(Role).all()
-    total_roles_count = len(roles)
 
-    return StatsResponse(
-        total_users=user_count,
-        total_blog_posts=blog_count,
-        total_blog_likes=blog_likes_count,
-        total_comments=comments_count,
-        total_comment_likes=comment_likes_count,
-        flagged_blogs=flagged_blogs_count,
-        flagged_comments=flagged_comments_count,
-        total_roles=total_roles_count
-    )
+@router.get("/auth")
+def get_auth_stats(
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    return {
+        "tokens": token_cache.stats(),
+        "principals": principal_cache.stats(),
+        "roles": role_registry.stats(),
+        "hashing": hashing_pool.stats(),
+    }
+
+
+@router.get("/views")
+def get_view_counter_stats(
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    return view_counter.stats()
+
+
+@router.get("/db/pool")
+def get_pool_stats(
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    engines = [engine, *replica_engines]
+    if async_engine is not None:
+        engines += [async_engine, *async_replica_engines]
+    return pool_stats(*engines)
+
+
+@router.get("/db/slow-queries")
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(allowed_permission(Permission.VIEW_STATS)),
+):
+    return {**slow_query_log.stats(), "queries": slow_query_log.recent(limit)}
@@ -1,17 +1,65 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
 from database import get_db
-from sqlalchemy.orm import Session
-from schemas.blog import BlogCreate, BlogRead, BlogUpdate, BlogDelete
-from schemas.comment import CommentCreate, CommentRead, CommentUpdate, CommentDelete
-from schemas.like import BlogLikeResponse, CommentLikeResponse
-from models import Blog, User, Comment, FlaggedBlog, FlaggedComment
+from sqlalchemy.orm import Session, aliased, load_only
+from schemas.blog import (
+    BlogCreate,
+    BlogRead,
+    BlogSummary,
+    BlogSearchResult,
+    BlogTrending,
+    BlogViewsRead,
+    BlogUpdate,
+    BlogDelete,
+)
+from schemas.comment import (
+    CommentCreate,
+    CommentRead,
+    CommentNode,
+    CommentUpdate,
+    CommentDelete,
+)
+from schemas.like import (
+    BlogLikeResponse,
+    CommentLikeResponse,
+    LikeToggleResponse,
+    LikerRead,
+    BlogViewerState,
+    CommentViewerState,
+)
+from schemas.pagination import Page
+from models import (
+    Blog,
+    BlogLike,
+    User,
+    Comment,
+    CommentLike,
+    FlaggedBlog,
+    FlaggedComment,
+)
+from models.role import Permission
 from utils.user import (
     get_current_user,
+    get_optional_user,
     allow_blog_owner_or_roles,
-    allowed_role,
+    allowed_permission,
     allow_comment_owner_or_roles,
 )
-from typing import List
+from utils.cache import (
+    cached_get,
+    invalidate,
+    object_cache,
+    object_key,
+)
+from utils.counters import toggle_like
+from utils.conditional import conditional, is_conditional, make_etag
+from utils.pagination import NEXT, decode_cursor, encode_cursor, paginate, row_pivot
+from utils.search import search_query, search_snippets
+from utils.text import make_excerpt
+from utils.threads import blog_comment_ids, load_thread, thread_ids
+from utils.trending import hot_score, refresh_hot_scores
+from utils.views import HyperLogLog, view_counter, viewer_key
+from typing import List, Literal, Optional
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 
@@ -19,37 +67,223 @@ router = APIRouter(prefix="/blogs", tags=["Blogs"])
 
 
 # -----------------------------------Blog------------------------------------------#
-@router.get("/", response_model=List[BlogRead])
-def get_all_blogs(db: Session = Depends(get_db)):
-    blogs = db.query(Blog).all()
-    if not blogs:
+# list views never touch the large content column
+SUMMARY_COLUMNS = (
+    Blog.id,
+    Blog.title,
+    Blog.excerpt,
+    Blog.main_image_url,
+    Blog.created_at,
+    Blog.updated_at,
+    Blog.owner_id,
+    Blog.likes_count,
+)
+
+
+@router.get("/", response_model=Page[BlogSummary])
+def get_all_blogs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    summaries = db.query(Blog).options(load_only(*SUMMARY_COLUMNS))
+    return paginate(
+        summaries,
+        order_by=[Blog.created_at, Blog.id],
+        key_of=lambda blog: (blog.created_at, blog.id),
+        limit=limit,
+        cursor=cursor,
+        resolve=row_pivot(Blog.id, Blog.created_at),
+    )
+
+
+@router.get("/trending", response_model=Page[BlogTrending])
+def get_trending_blogs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    trending = db.query(Blog).options(load_only(*SUMMARY_COLUMNS, Blog.hot_score))
+    # scores move while a client pages, so the cursor keeps the values it was
+    # issued with instead of re-reading the boundary row
+    return paginate(
+        trending,
+        order_by=[Blog.hot_score, Blog.id],
+        key_of=lambda blog: (blog.hot_score, blog.id),
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def blog_counts(ids: List[int]):
+    return (
+        select(Blog.id, Blog.likes_count, func.count(Comment.id))
+        .outerjoin(Comment, Comment.blog_id == Blog.id)
+        .where(Blog.id.in_(ids))
+        .group_by(Blog.id, Blog.likes_count)
+    )
+
+
+def liked_blogs(ids: List[int], user_id: int):
+    return select(BlogLike.c.blog_id).where(
+        BlogLike.c.user_id == user_id, BlogLike.c.blog_id.in_(ids)
+    )
+
+
+def viewer_states(counts, liked):
+    return [
+        {
+            "blog_id": blog_id,
+            "likes_count": likes_count,
+            "comments_count": comments_count,
+            "liked": blog_id in liked,
+        }
+        for blog_id, likes_count, comments_count in counts
+    ]
+
+
+@router.get("/state", response_model=List[BlogViewerState])
+def get_blogs_state(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    counts = db.execute(blog_counts(ids)).all()
+    liked = set()
+    if current_user is not None and counts:
+        liked = set(db.scalars(liked_blogs(ids, current_user.id)))
+    return viewer_states(counts, liked)
+
+
+@router.get("/search", response_model=Page[BlogSearchResult])
+def search_blogs(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    q = q.strip()
+    if not q:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="No blog exists yet."
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Search query has no terms.",
         )
-    return blogs
+    query, rank = search_query(db, q)
+    page = paginate(
+        query,
+        order_by=[rank, Blog.id],
+        key_of=lambda row: (row.rank, row.id),
+        limit=limit,
+        cursor=cursor,
+    )
+    snippets = search_snippets(db, q, [row.id for row in page["items"]])
+    page["items"] = [
+        {**row._mapping, "snippet": snippets.get(row.id)} for row in page["items"]
+    ]
+    return page
+
+
+def blog_validators(
+    blog_id: int,
+    created_at: datetime,
+    updated_at: Optional[datetime],
+    likes_count: int,
+):
+    last_modified = updated_at or created_at
+    return make_etag("blog", blog_id, last_modified, likes_count), last_modified
+
+
+def cached_blog_version(blog_id: int):
+    cached = object_cache.get(object_key(Blog, blog_id))
+    if cached is None:
+        return None
+    return blog_validators(
+        blog_id, cached["created_at"], cached["updated_at"], cached["likes_count"]
+    )
+
+
+def blog_version_query(blog_id: int):
+    return select(Blog.created_at, Blog.updated_at, Blog.likes_count).where(
+        Blog.id == blog_id
+    )
+
+
+def blog_version(blog_id: int, db: Session):
+    cached = cached_blog_version(blog_id)
+    if cached is not None:
+        return cached
+    row = db.execute(blog_version_query(blog_id)).first()
+    if row is None:
+        return None
+    return blog_validators(blog_id, row.created_at, row.updated_at, row.likes_count)
 
 
 @router.get("/{blog_id}", response_model=BlogRead)
-def get_blog_with_id(blog_id: int, db: Session = Depends(get_db)):
-    blog = db.query(Blog).filter(Blog.id == blog_id).first()
+def get_blog_with_id(
+    blog_id: int, request: Request, response: Response, db: Session = Depends(get_db)
+):
+    # revalidation only needs the timestamps, not the content
+    if is_conditional(request):
+        version = blog_version(blog_id, db)
+        if version is not None:
+            not_modified = conditional(request, response, *version)
+            if not_modified:
+                return not_modified
+
+    blog = cached_get(db, Blog, blog_id)
     if not blog:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Blog doesn't exist"
         )
+    conditional(
+        request,
+        response,
+        *blog_validators(blog.id, blog.created_at, blog.updated_at, blog.likes_count),
+    )
+    view_counter.record(blog.id, viewer_key(request))
     return blog
 
 
+def blog_views_query(blog_id: int):
+    return select(Blog.view_count, Blog.viewer_sketch).where(Blog.id == blog_id)
+
+
+def blog_views(blog_id: int, row):
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Blog doesn't exist"
+        )
+
+    # include views still buffered in this process
+    sketch = HyperLogLog(row.viewer_sketch)
+    pending = view_counter.pending_sketch(blog_id)
+    if pending is not None:
+        sketch.merge(pending)
+    return {
+        "blog_id": blog_id,
+        "view_count": row.view_count + view_counter.pending(blog_id),
+        "unique_viewers": sketch.estimate(),
+    }
+
+
+@router.get("/{blog_id}/views", response_model=BlogViewsRead)
+def get_blog_views(blog_id: int, db: Session = Depends(get_db)):
+    return blog_views(blog_id, db.execute(blog_views_query(blog_id)).first())
+
+
 @router.post("/", response_model=BlogRead)
 def create_blog(
     blog: BlogCreate,
     db: Session = Depends(get_db),
-    current_user=Depends(allowed_role("author")),
+    current_user=Depends(allowed_permission(Permission.PUBLISH)),
 ):
     new_blog = Blog(
         title=blog.title,
         content=blog.content,
+        excerpt=make_excerpt(blog.content),
         main_image_url=blog.main_image_url,
         owner_id=current_user.id,
+        hot_score=hot_score(0, 0, 0, datetime.now(timezone.utc)),
     )
     try:
         db.add(new_blog)
@@ -64,7 +298,7 @@ def create_blog(
 
 
 def get_blog_by_id(blog_id: int, db: Session):
-    return db.query(Blog).filter(Blog.id == blog_id).first()
+    return cached_get(db, Blog, blog_id)
 
 
 @router.delete("/{blog_id}", response_model=BlogDelete)
@@ -74,15 +308,18 @@ def delete_blog(
         allow_blog_owner_or_roles(
             get_blog_by_id,
             owner_attribute="owner_id",
-            allowed_roles=["admin", "moderator"],
+            permission=Permission.MODERATE,
         )
     ),
     db: Session = Depends(get_db),
 ):
+    comment_ids = blog_comment_ids(db, blog_id)
     try:
         db.delete(blog)
         db.commit()
-        return {"blog": blog, "messgae": "Blog successfully deleted"}
+        invalidate(Blog, blog_id)
+        invalidate(Comment, *comment_ids)
+        return {"blog": blog, "message": "Blog successfully deleted"}
     except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,18 +332,20 @@ def update_blog(
     blog_id: int,
     blog: BlogUpdate,
     existing_blog=Depends(
-        allow_blog_owner_or_roles(
-            get_blog_by_id, owner_attribute="owner_id", allowed_roles=[]
-        )
+        allow_blog_owner_or_roles(get_blog_by_id, owner_attribute="owner_id")
     ),
     db: Session = Depends(get_db),
 ):
     new_data = blog.model_dump(exclude_unset=True)
     for key, value in new_data.items():
         setattr(existing_blog, key, value)
+    if new_data.get("content") is not None:
+        # A null content falls through to the NOT NULL constraint below.
+        existing_blog.excerpt = make_excerpt(existing_blog.content)
     existing_blog.updated_at = datetime.now(timezone.utc)
     try:
         db.commit()
+        invalidate(Blog, blog_id)
         db.refresh(existing_blog)
     except IntegrityError:
         db.rollback()
@@ -121,63 +360,173 @@ def update_blog(
 # --------------------------------Likes on posts -------------------------------------------------------
 
 
-@router.post("/{blog_id}/like")
+@router.post("/{blog_id}/like", response_model=LikeToggleResponse)
 def like_post(
     blog_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    blog = db.query(Blog).filter(Blog.id == blog_id).first()
-    if not blog:
+    try:
+        result = toggle_like(db, BlogLike, Blog, "blog_id", blog_id, current_user.id)
+    except IntegrityError:
+        result = None
+    if result is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found"
         )
 
-    if current_user in blog.likes:
-        blog.likes.remove(current_user)
-        action = "unliked"
-    else:
-        blog.likes.append(current_user)
-        action = "liked"
-
+    refresh_hot_scores(db, [blog_id])
     db.commit()
-    db.refresh(blog)
+    invalidate(Blog, blog_id)
 
-    return {"message": f"Post {action} successfully."}
+    liked, likes_count = result
+    action = "liked" if liked else "unliked"
+    return {
+        "message": f"Post {action} successfully.",
+        "liked": liked,
+        "likes_count": likes_count,
+    }
 
 
 @router.get("/{blog_id}/likes", response_model=BlogLikeResponse)
 def total_likes_on_post(blog_id: int, db: Session = Depends(get_db)):
-    blog = db.query(Blog).filter(Blog.id == blog_id).first()
+    blog = cached_get(db, Blog, blog_id)
 
     if not blog:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Blog doesn't exist"
         )
 
-    return {
-        "blog_id": blog.id,
-        "likes_count": len(blog.likes),
-        "user_ids": [user.id for user in blog.likes],
-    }
+    return {"blog_id": blog.id, "likes_count": blog.likes_count}
+
+
+@router.get("/{blog_id}/likers", response_model=Page[LikerRead])
+def get_post_likers(
+    blog_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    if not cached_get(db, Blog, blog_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Blog doesn't exist"
+        )
+
+    likers = db.query(
+        BlogLike.c.user_id, BlogLike.c.created_at.label("liked_at")
+    ).filter(BlogLike.c.blog_id == blog_id)
+    return paginate(
+        likers,
+        order_by=[BlogLike.c.created_at, BlogLike.c.user_id],
+        key_of=lambda row: (row.liked_at, row.user_id),
+        limit=limit,
+        cursor=cursor,
+        resolve=row_pivot(
+            BlogLike.c.user_id,
+            BlogLike.c.created_at,
+            where=[BlogLike.c.blog_id == blog_id],
+        ),
+    )
 
 
 # --------------------------Comments -------------------------------------------------------------------
 
 
-@router.get("/{blog_id}/comments", response_model=List[CommentRead])
-def get_all_comments_on_post(blog_id: int, db: Session = Depends(get_db)):
-    blog = db.query(Blog).filter(Blog.id == blog_id).first()
+def comments_version(blog_id: int, db: Session):
+    # Likes reorder the "top" sort and deletes shrink every sort without
+    # moving any timestamp a Last-Modified could carry, so comment lists are
+    # validated by ETag only, built from the trigger-maintained version.
+    version = db.query(Blog.comments_version).filter(Blog.id == blog_id).scalar()
+    return make_etag("comments", blog_id, version), None
+
+
+@router.get("/{blog_id}/comments", response_model=Page[CommentRead])
+def get_all_comments_on_post(
+    blog_id: int,
+    request: Request,
+    response: Response,
+    sort: Literal["newest", "oldest", "top"] = "newest",
+    parent_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    blog = cached_get(db, Blog, blog_id)
 
     if not blog:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post doesn't exist"
         )
-    comments = blog.comments
 
-    if not comments:
-        raise HTTPException(status_code=status.HTTP_200_OK, detail="No comments exist")
-    return comments
+    not_modified = conditional(request, response, *comments_version(blog_id, db))
+    if not_modified:
+        return not_modified
+
+    # top-level comments by default, or the direct replies to parent_id
+    query = db.query(Comment).filter(
+        Comment.blog_id == blog_id,
+        Comment.parent_id == parent_id
+        if parent_id is not None
+        else Comment.parent_id.is_(None),
+    )
+
+    if sort == "top":
+        return paginate(
+            query,
+            order_by=[Comment.likes_count, Comment.id],
+            key_of=lambda comment: (comment.likes_count, comment.id),
+            limit=limit,
+            cursor=cursor,
+        )
+
+    return paginate(
+        query,
+        order_by=[Comment.created_at, Comment.id],
+        key_of=lambda comment: (comment.created_at, comment.id),
+        limit=limit,
+        cursor=cursor,
+        descending=sort == "newest",
+        resolve=row_pivot(Comment.id, Comment.created_at),
+    )
+
+
+def tree_cursor_key(cursor: Optional[str]):
+    if not cursor:
+        return None
+    direction, after = decode_cursor(cursor)
+    if direction != NEXT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return after
+
+
+def tree_page(roots: List[dict], has_more: bool):
+    next_cursor = None
+    if has_more:
+        last = roots[-1]
+        next_cursor = encode_cursor(NEXT, (last["created_at"], last["id"]))
+    return {"items": roots, "next_cursor": next_cursor}
+
+
+@router.get("/{blog_id}/comments/tree", response_model=Page[CommentNode])
+def get_comment_tree(
+    blog_id: int,
+    depth: int = Query(5, ge=1, le=20),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    if not cached_get(db, Blog, blog_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Post doesn't exist"
+        )
+
+    roots, has_more = load_thread(
+        db, blog_id, depth=depth, limit=limit, after=tree_cursor_key(cursor)
+    )
+    return tree_page(roots, has_more)
 
 
 @router.post("/{blog_id}/comments", response_model=CommentRead)
@@ -185,7 +534,7 @@ def create_comments_on_post(
     blog_id: int,
     comment: CommentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin", "moderator", "author", "user")),
+    current_user: User = Depends(allowed_permission(Permission.COMMENT)),
 ):
     post = db.query(Blog).filter(Blog.id == blog_id).first()
 
@@ -204,6 +553,8 @@ def create_comments_on_post(
 
     try:
         db.add(new_comment)
+        db.flush()
+        refresh_hot_scores(db, [blog_id])
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -217,8 +568,44 @@ def create_comments_on_post(
 comment_router = APIRouter(prefix="/comments", tags=["Comments"])
 
 
+@comment_router.get("/state", response_model=List[CommentViewerState])
+def get_comments_state(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    reply = aliased(Comment)
+    counts = (
+        db.query(Comment.id, Comment.likes_count, func.count(reply.id))
+        .outerjoin(
+            reply, (reply.blog_id == Comment.blog_id) & (reply.parent_id == Comment.id)
+        )
+        .filter(Comment.id.in_(ids))
+        .group_by(Comment.id, Comment.likes_count)
+        .all()
+    )
+    liked = set()
+    if current_user is not None and counts:
+        liked = {
+            comment_id
+            for (comment_id,) in db.query(CommentLike.c.comment_id).filter(
+                CommentLike.c.user_id == current_user.id,
+                CommentLike.c.comment_id.in_(ids),
+            )
+        }
+    return [
+        {
+            "comment_id": comment_id,
+            "likes_count": likes_count,
+            "reply_count": reply_count,
+            "liked": comment_id in liked,
+        }
+        for comment_id, likes_count, reply_count in counts
+    ]
+
+
 def get_comment_by_id(comment_id: int, db: Session):
-    return db.query(Comment).filter(Comment.id == comment_id).first()
+    return cached_get(db, Comment, comment_id)
 
 
 @comment_router.delete("/{comment_id}", response_model=CommentDelete)
@@ -229,7 +616,7 @@ def comment_delete(
         allow_comment_owner_or_roles(
             get_comment_by_id,
             owner_attribute="owner_id",
-            allowed_roles=["admin", "moderator"],
+            permission=Permission.MODERATE,
         )
     ),
 ):
@@ -238,9 +625,13 @@ def comment_delete(
             status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
         )
 
+    deleted_ids = thread_ids(db, comment.id)
     try:
         db.delete(comment)
+        db.flush()
+        refresh_hot_scores(db, [comment.blog_id])
         db.commit()
+        invalidate(Comment, *deleted_ids)
         return {"comment": comment, "message": "comment successfully deleted"}
     except IntegrityError:
         db.rollback()
@@ -255,9 +646,7 @@ def comment_update(
     new_comment: CommentUpdate,
     db: Session = Depends(get_db),
     comment=Depends(
-        allow_comment_owner_or_roles(
-            get_comment_by_id, owner_attribute="owner_id", allowed_roles=[]
-        )
+        allow_comment_owner_or_roles(get_comment_by_id, owner_attribute="owner_id")
     ),
 ):
     if not comment:
@@ -272,6 +661,7 @@ def comment_update(
 
     try:
         db.commit()
+        invalidate(Comment, comment_id)
         db.refresh(comment)
         return comment
     except IntegrityError:
@@ -284,45 +674,75 @@ def comment_update(
 # --------------------------------------------- Likes on comments -------------------------------------------
 
 
-@comment_router.post("/{comment_id}/like")
+@comment_router.post("/{comment_id}/like", response_model=LikeToggleResponse)
 def like_comment(
     comment_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
+    try:
+        result = toggle_like(
+            db, CommentLike, Comment, "comment_id", comment_id, current_user.id
+        )
+    except IntegrityError:
+        result = None
+    if result is None:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Blog not found"
+            status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
         )
 
-    if current_user in comment.likes:
-        comment.likes.remove(current_user)
-        action = "unliked"
-    else:
-        comment.likes.append(current_user)
-        action = "liked"
-
     db.commit()
-    db.refresh(comment)
+    invalidate(Comment, comment_id)
 
-    return {"message": f"Post {action} successfully."}
+    liked, likes_count = result
+    action = "liked" if liked else "unliked"
+    return {
+        "message": f"Comment {action} successfully.",
+        "liked": liked,
+        "likes_count": likes_count,
+    }
 
 
 @comment_router.get("/{comment_id}/likes", response_model=CommentLikeResponse)
 def total_likes_on_comment(comment_id: int, db: Session = Depends(get_db)):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = cached_get(db, Comment, comment_id)
 
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Blog doesn't exist"
         )
 
-    return {
-        "comment_id": comment.id,
-        "likes_count": len(comment.likes),
-        "user_ids": [user.id for user in comment.likes],
-    }
+    return {"comment_id": comment.id, "likes_count": comment.likes_count}
+
+
+@comment_router.get("/{comment_id}/likers", response_model=Page[LikerRead])
+def get_comment_likers(
+    comment_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    if not cached_get(db, Comment, comment_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Comment doesn't exist"
+        )
+
+    likers = db.query(
+        CommentLike.c.user_id, CommentLike.c.created_at.label("liked_at")
+    ).filter(CommentLike.c.comment_id == comment_id)
+    return paginate(
+        likers,
+        order_by=[CommentLike.c.created_at, CommentLike.c.user_id],
+        key_of=lambda row: (row.liked_at, row.user_id),
+        limit=limit,
+        cursor=cursor,
+        resolve=row_pivot(
+            CommentLike.c.user_id,
+            CommentLike.c.created_at,
+            where=[CommentLike.c.comment_id == comment_id],
+        ),
+    )
 
 
 # ------------------------------------Flag comment and blog -----------------------------------------------------------
@@ -331,7 +751,7 @@ def total_likes_on_comment(comment_id: int, db: Session = Depends(get_db)):
 @router.post("/{blog_id}/flag")
 def flag_blog(
     blog_id: int,
-    current_user: User = Depends(allowed_role("moderator", "author", "user")),
+    current_user: User = Depends(allowed_permission(Permission.FLAG)),
     db: Session = Depends(get_db),
 ):
     blog = db.query(Blog).filter(Blog.id == blog_id).first()
@@ -363,7 +783,7 @@ def flag_blog(
 @comment_router.post("/{comment_id}/flag")
 def flag_commemt(
     comment_id: int,
-    current_user: User = Depends(allowed_role("moderator", "author", "user")),
+    current_user: User = Depends(allowed_permission(Permission.FLAG)),
     db: Session = Depends(get_db),
 ):
     comment = db.query(Comment).filter(Comment.id == comment_id).first()
@@ -0,0 +1,164 @@
+"""Async versions of the hottest blog reads, mounted when DB_ASYNC is set.
+
+Every query here is awaited on an AsyncSession, and the only other work is
+the in-process object cache and view counter, so a request never holds one
+of Starlette's threadpool workers. The statements and response shaping are
+shared with ``routes.blog``. Search, comment pages and all writes are served
+by the sync routes only.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from database import get_async_db
+from models import Blog, User
+from routes import blog as sync_routes
+from schemas.blog import (
+    BlogRead,
+    BlogSearchResult,
+    BlogSummary,
+    BlogTrending,
+    BlogViewsRead,
+)
+from schemas.comment import CommentNode
+from schemas.like import BlogLikeResponse, BlogViewerState
+from schemas.pagination import Page
+from utils.cache import cached_values
+from utils.conditional import conditional, is_conditional
+from utils.pagination import paginate_async, row_pivot
+from utils.threads import load_thread_async
+from utils.user import get_optional_user_async
+from utils.views import view_counter, viewer_key
+
+router = APIRouter(prefix="/blogs", tags=["Blogs"])
+
+
+async def get_blog_values(db: AsyncSession, blog_id: int, detail: str) -> dict:
+    blog = await cached_values(db, Blog, blog_id)
+    if blog is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return blog
+
+
+@router.get("/", response_model=Page[BlogSummary])
+async def get_all_blogs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await paginate_async(
+        db,
+        select(Blog).options(load_only(*sync_routes.SUMMARY_COLUMNS)),
+        order_by=[Blog.created_at, Blog.id],
+        key_of=lambda blog: (blog.created_at, blog.id),
+        limit=limit,
+        cursor=cursor,
+        resolve=row_pivot(Blog.id, Blog.created_at),
+    )
+
+
+@router.get("/trending", response_model=Page[BlogTrending])
+async def get_trending_blogs(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await paginate_async(
+        db,
+        select(Blog).options(load_only(*sync_routes.SUMMARY_COLUMNS, Blog.hot_score)),
+        order_by=[Blog.hot_score, Blog.id],
+        key_of=lambda blog: (blog.hot_score, blog.id),
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+@router.get("/state", response_model=List[BlogViewerState])
+async def get_blogs_state(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[User] = Depends(get_optional_user_async),
+):
+    counts = (await db.execute(sync_routes.blog_counts(ids))).all()
+    liked = set()
+    if current_user is not None and counts:
+        liked = set(await db.scalars(sync_routes.liked_blogs(ids, current_user.id)))
+    return sync_routes.viewer_states(counts, liked)
+
+
+# Not async: registered again only so that it is matched before /{blog_id}.
+router.add_api_route(
+    "/search",
+    sync_routes.search_blogs,
+    methods=["GET"],
+    response_model=Page[BlogSearchResult],
+    include_in_schema=False,
+)
+
+
+@router.get("/{blog_id}", response_model=BlogRead)
+async def get_blog_with_id(
+    blog_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # revalidation only needs the timestamps, not the content
+    if is_conditional(request):
+        version = sync_routes.cached_blog_version(blog_id)
+        if version is None:
+            row = (await db.execute(sync_routes.blog_version_query(blog_id))).first()
+            if row is not None:
+                version = sync_routes.blog_validators(
+                    blog_id, row.created_at, row.updated_at, row.likes_count
+                )
+        if version is not None:
+            not_modified = conditional(request, response, *version)
+            if not_modified:
+                return not_modified
+
+    blog = await get_blog_values(db, blog_id, "Blog doesn't exist")
+    conditional(
+        request,
+        response,
+        *sync_routes.blog_validators(
+            blog_id, blog["created_at"], blog["updated_at"], blog["likes_count"]
+        ),
+    )
+    view_counter.record(blog_id, viewer_key(request))
+    return blog
+
+
+@router.get("/{blog_id}/views", response_model=BlogViewsRead)
+async def get_blog_views(blog_id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(sync_routes.blog_views_query(blog_id))).first()
+    return sync_routes.blog_views(blog_id, row)
+
+
+@router.get("/{blog_id}/likes", response_model=BlogLikeResponse)
+async def total_likes_on_post(blog_id: int, db: AsyncSession = Depends(get_async_db)):
+    blog = await get_blog_values(db, blog_id, "Blog doesn't exist")
+    return {"blog_id": blog_id, "likes_count": blog["likes_count"]}
+
+
+@router.get("/{blog_id}/comments/tree", response_model=Page[CommentNode])
+async def get_comment_tree(
+    blog_id: int,
+    depth: int = Query(5, ge=1, le=20),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await get_blog_values(db, blog_id, "Post doesn't exist")
+    roots, has_more = await load_thread_async(
+        db,
+        blog_id,
+        depth=depth,
+        limit=limit,
+        after=sync_routes.tree_cursor_key(cursor),
+    )
+    return sync_routes.tree_page(roots, has_more)
@@ -0,0 +1,174 @@
+from typing import Dict, List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from config.session import async_engine, async_replica_engines, engine, replica_engines
+from utils.cache import object_cache
+from utils.db_pool import pool_stats
+from utils.hashing import hashing_pool, token_cache
+from utils.metrics import family, histogram_family, request_metrics
+from utils.principal import principal_cache
+from utils.rollups import rollup_job
+from utils.views import view_counter
+
+router = APIRouter(tags=["Metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def cache_metrics() -> List[str]:
+    caches = {
+        "objects": object_cache.stats(),
+        "principals": principal_cache.stats(),
+        "tokens": token_cache.stats(),
+    }
+
+    def samples(key: str):
+        return [
+            ({"cache": name}, stats[key])
+            for name, stats in caches.items()
+            if key in stats
+        ]
+
+    return [
+        *family(
+            "cache_hits_total", "counter", "Cache lookups served.", samples("hits")
+        ),
+        *family(
+            "cache_misses_total",
+            "counter",
+            "Cache lookups that missed.",
+            samples("misses"),
+        ),
+        *family("cache_entries", "gauge", "Entries held.", samples("entries")),
+        *family(
+            "cache_evictions_total",
+            "counter",
+            "Entries evicted for space.",
+            samples("evictions"),
+        ),
+    ]
+
+
+def pool_metrics() -> List[str]:
+    engines = [engine, *replica_engines]
+    if async_engine is not None:
+        engines += [async_engine, *async_replica_engines]
+    pools: Dict[str, dict] = {
+        name: stats
+        for name, stats in pool_stats(*engines).items()
+        if "checkouts" in stats
+    }
+
+    def samples(key: str):
+        return [({"pool": name}, stats[key]) for name, stats in pools.items()]
+
+    return [
+        *family("db_pool_size", "gauge", "Connections kept open.", samples("size")),
+        *family(
+            "db_pool_checked_out",
+            "gauge",
+            "Connections in use.",
+            samples("checked_out"),
+        ),
+        *family(
+            "db_pool_overflow",
+            "gauge",
+            "Connections open beyond the pool size.",
+            samples("overflow"),
+        ),
+        *family(
+            "db_pool_checkouts_total",
+            "counter",
+            "Connection checkouts.",
+            samples("checkouts"),
+        ),
+        *family(
+            "db_pool_exhausted_total",
+            "counter",
+            "Checkouts that had to wait for a full pool.",
+            samples("exhausted"),
+        ),
+        *family(
+            "db_pool_timeouts_total",
+            "counter",
+            "Checkouts that gave up waiting.",
+            samples("timeouts"),
+        ),
+        *histogram_family(
+            "db_pool_checkout_seconds",
+            "Time to check out a connection.",
+            [
+                ({"pool": name}, stats["checkout_seconds"])
+                for name, stats in pools.items()
+            ],
+        ),
+    ]
+
+
+def background_metrics() -> List[str]:
+    views = view_counter.stats()
+    rollups = rollup_job.stats()
+    hashing = hashing_pool.stats()
+    return [
+        *family(
+            "view_counter_pending_views",
+            "gauge",
+            "Views buffered, not yet written.",
+            [({}, views["pending_views"])],
+        ),
+        *family(
+            "view_counter_flushes_total",
+            "counter",
+            "View buffer flushes.",
+            [({}, views["flushes"])],
+        ),
+        *family(
+            "view_counter_failed_flushes_total",
+            "counter",
+            "View buffer flushes that failed.",
+            [({}, views["failed_flushes"])],
+        ),
+        *family(
+            "view_counter_flushed_views_total",
+            "counter",
+            "Views written to the database.",
+            [({}, views["flushed_views"])],
+        ),
+        *family(
+            "stats_rollup_runs_total",
+            "counter",
+            "Stats rollup runs.",
+            [({}, rollups["runs"])],
+        ),
+        *family(
+            "stats_rollup_failed_runs_total",
+            "counter",
+            "Stats rollup runs that failed.",
+            [({}, rollups["failed_runs"])],
+        ),
+        *family(
+            "password_hashing_in_flight",
+            "gauge",
+            "Password hashes running or queued.",
+            [({}, hashing["in_flight"])],
+        ),
+        *family(
+            "password_hashing_rejected_total",
+            "counter",
+            "Sign-ins turned away with 503.",
+            [({}, hashing["rejected"])],
+        ),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    lines = [
+        *request_metrics.render(),
+        *cache_metrics(),
+        *pool_metrics(),
+        *background_metrics(),
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -5,7 +5,11 @@ from schemas.flagged_blog import FlaggedBlogRead
 from schemas.flagged_comment import FlaggedCommentRead
 from typing import List
 from models import Blog, User, Comment, FlaggedBlog, FlaggedComment
-from utils.user import allowed_role
+from models.role import Permission
+from utils.user import allowed_permission
+from utils.cache import invalidate
+from utils.threads import blog_comment_ids, thread_ids
+from utils.trending import refresh_hot_scores
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/moderation", tags=["Moderation"])
@@ -14,7 +18,7 @@ router = APIRouter(prefix="/moderation", tags=["Moderation"])
 @router.get("/blogs", response_model=List[FlaggedBlogRead])
 def get_flagged_blog(
     db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin", "moderator")),
+    current_user: User = Depends(allowed_permission(Permission.MODERATE)),
 ):
     flagged_blogs = db.query(FlaggedBlog).all()
     if not flagged_blogs:
@@ -28,7 +32,7 @@ def get_flagged_blog(
 @router.get("/comments", response_model=List[FlaggedCommentRead])
 def get_flagged_comment(
     db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin", "moderator")),
+    current_user: User = Depends(allowed_permission(Permission.MODERATE)),
 ):
     flagged_comments = db.query(FlaggedComment).all()
     if not flagged_comments:
@@ -44,7 +48,7 @@ def approve_or_delete_flagged_blog(
     approved: bool,
     blog_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin", "moderator")),
+    current_user: User = Depends(allowed_permission(Permission.MODERATE)),
 ):
     blog = db.query(Blog).filter(Blog.id == blog_id).first()
 
@@ -68,9 +72,12 @@ def approve_or_delete_flagged_blog(
                 detail="Integrity issue on flagged blogs, cannot perform action",
             )
     else:
+        comment_ids = blog_comment_ids(db, blog.id)
         try:
             db.delete(blog)
             db.commit()
+            invalidate(Blog, blog.id)
+            invalidate(Comment, *comment_ids)
             return {"message": "Blog deleted due to disapproval"}
         except IntegrityError:
             db.rollback()
@@ -85,7 +92,7 @@ def approve_or_delete_flagged_comment(
     approved: bool,
     comment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin", "moderator")),
+    current_user: User = Depends(allowed_permission(Permission.MODERATE)),
 ):
     comment = db.query(Comment).filter(Comment.id == comment_id).first()
 
@@ -111,9 +118,13 @@ def approve_or_delete_flagged_comment(
                 detail="Integrity issue on flagged comments, cannot perform action",
             )
     else:
+        deleted_ids = thread_ids(db, comment.id)
         try:
             db.delete(comment)
+            db.flush()
+            refresh_hot_scores(db, [comment.blog_id])
             db.commit()
+            invalidate(Comment, *deleted_ids)
             return {"message": "Comment deleted due to disapproval"}
         except IntegrityError:
             db.rollback()
@@ -1,9 +1,12 @@
 from models import Role, User
+from models.role import DEFAULT_ROLE, Permission
 from fastapi import Depends, APIRouter, HTTPException, status
 from database import get_db
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from utils.user import allowed_role
+from utils.permissions import role_registry
+from utils.principal import invalidate_principal
+from utils.user import allowed_permission
 from typing import List, Dict
 from schemas.role import RoleCreate, RoleRead, RoleUpdate
 from schemas.user import UserRead
@@ -11,9 +14,20 @@ from schemas.user import UserRead
 router = APIRouter(prefix="/roles", tags=["roles"])
 
 
+def permission_bits(names: List[str]) -> int:
+    try:
+        return int(Permission.from_names(names))
+    except KeyError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown permission {error}.",
+        )
+
+
 @router.get("/", response_model=List[RoleRead])
 def get_roles(
-    current_user: User = Depends(allowed_role("admin")), db: Session = Depends(get_db)
+    current_user: User = Depends(allowed_permission(Permission.MANAGE_ROLES)),
+    db: Session = Depends(get_db),
 ):
     roles = db.query(Role).all()
     return roles
@@ -22,7 +36,7 @@ def get_roles(
 @router.post("/", response_model=RoleRead)
 def create_role(
     role: RoleCreate,
-    current_user: User = Depends(allowed_role("admin")),
+    current_user: User = Depends(allowed_permission(Permission.MANAGE_ROLES)),
     db: Session = Depends(get_db),
 ):
     existing_role = db.query(Role).filter(Role.role_name == role.role_name).first()
@@ -33,9 +47,12 @@ def create_role(
         )
 
     new_role = Role(role_name=role.role_name)
+    if role.permissions is not None:
+        new_role.permissions = permission_bits(role.permissions)
     db.add(new_role)
 
     db.commit()
+    role_registry.load(db)
     db.refresh(new_role)
     return new_role
 
@@ -43,7 +60,7 @@ def create_role(
 @router.delete("/{role_id}", response_model=Dict[str, str])
 def delete_role(
     role_id: int,
-    current_user=Depends(allowed_role("admin")),
+    current_user=Depends(allowed_permission(Permission.MANAGE_ROLES)),
     db: Session = Depends(get_db),
 ):
     role = db.query(Role).filter(Role.id == role_id).first()
@@ -55,6 +72,7 @@ def delete_role(
     try:
         db.delete(role)
         db.commit()
+        role_registry.load(db)
         return {"message": f"Role: {role_id} successfully deleted"}
     except IntegrityError:
         db.rollback()
@@ -68,7 +86,7 @@ def delete_role(
 def update_role(
     role_id: int,
     role: RoleUpdate,
-    current_user=Depends(allowed_role("admin")),
+    current_user=Depends(allowed_permission(Permission.MANAGE_ROLES)),
     db: Session = Depends(get_db),
 ):
     existing_role = db.query(Role).filter(Role.id == role_id).first()
@@ -78,10 +96,15 @@ def update_role(
             detail=f"Role id: '{role_id}' doesn't exist.",
         )
     if role.role_name is not None:
+        # keep the permissions the old name implied by default
+        existing_role.permissions = int(existing_role.granted)
         existing_role.role_name = role.role_name
+    if role.permissions is not None:
+        existing_role.permissions = permission_bits(role.permissions)
 
     try:
         db.commit()
+        role_registry.load(db)
         db.refresh(existing_role)
         return existing_role
     except IntegrityError:
@@ -96,7 +119,7 @@ def update_role(
 def assign_role_to_user(
     role_id: int,
     user_id: int,
-    current_user=Depends(allowed_role("admin")),
+    current_user=Depends(allowed_permission(Permission.MANAGE_ROLES)),
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.id == user_id).first()
@@ -114,6 +137,7 @@ def assign_role_to_user(
     user.role_id = role_id
     try:
         db.commit()
+        invalidate_principal(user.id)
         db.refresh(user)
         return user
     except IntegrityError:
@@ -127,7 +151,7 @@ def assign_role_to_user(
 def revoke_role_from_user(
     role_id: int,
     user_id: int,
-    current_user=Depends(allowed_role("admin")),
+    current_user=Depends(allowed_permission(Permission.MANAGE_ROLES)),
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.id == user_id).first()
@@ -143,10 +167,17 @@ def revoke_role_from_user(
         )
 
     if user.role_id == role_id:
-        user.role_id = 5
+        default_role_id = role_registry.id_of(DEFAULT_ROLE)
+        if default_role_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Default role '{DEFAULT_ROLE}' doesn't exist.",
+            )
+        user.role_id = default_role_id
 
     try:
         db.commit()
+        invalidate_principal(user.id)
         db.refresh(user)
         return user
     except IntegrityError:
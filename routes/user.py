@@ -1,40 +1,73 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
+from starlette.concurrency import run_in_threadpool
 from database import get_db
 from sqlalchemy.orm import Session
 from models import User
 from utils.hashing import (
     hash_password,
-    verify_password,
+    verify_and_update_password,
     create_access_token,
     decode_access_token
 )
 from schemas.user import UserCreate, UserRead, UserLogin, UserUpdate, UserLoginSuccess
+from utils.principal import invalidate_principal
 from utils.user import allowed_role, get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=UserRead)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    hashed_password = hash_password(user.password)
+# Sign-up and login are async so that waiting for the hashing pool holds no
+# threadpool thread; their database work still runs on the threadpool.
+
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     new_user = User(email=user.email, password=hashed_password, name=user.name)
     db.add(new_user)
     db.commit()
     return new_user
 
 
+def _find_user(db: Session, email: str):
+    existing_user = db.query(User).filter(User.email == email).first()
+    if existing_user:
+        # loaded here, not lazily on the event loop
+        existing_user.role
+    # ends the transaction so no connection is held while the password is checked
+    db.commit()
+    return existing_user
+
+
+def _update_password(db: Session, existing_user: User, new_hash: str) -> None:
+    existing_user.password = new_hash
+    db.commit()
+
+
+@router.post("/register", response_model=UserRead)
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    hashed_password = await hash_password(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
+
 @router.post("/login", response_model=UserLoginSuccess)
-def login_user(user: UserLogin, response: Response, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def login_user(
+    user: UserLogin, response: Response, db: Session = Depends(get_db)
+):
+    existing_user = await run_in_threadpool(_find_user, db, user.email)
 
     if not existing_user:
         raise HTTPException(status_code=404, detail=f"Wrong email")
 
-    if not verify_password(user.password, existing_user.password):
+    verified, new_hash = await verify_and_update_password(
+        user.password, existing_user.password
+    )
+    if not verified:
         raise HTTPException(status_code=404, detail="Wrong password")
+    if new_hash:
+        # the configured bcrypt cost changed since this password was stored
+        await run_in_threadpool(_update_password, db, existing_user, new_hash)
 
     token, max_age = create_access_token(
-        existing_user.email, existing_user.role.role_name
+        existing_user.id, existing_user.email, existing_user.role.role_name
     )
     print(existing_user.role.role_name)
 
@@ -67,15 +100,23 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
         raise HTTPException(status_code=401, detail="No access token provided")
 
     payload = decode_access_token(token)
+    user_id = payload.get("sub")
     email = payload.get("email")
-    if not email:
+    if not (user_id or email):
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
-    existing_user = db.query(User).filter(User.email == email).first()
+    if user_id:
+        existing_user = db.get(User, int(user_id))
+    else:
+        existing_user = db.query(User).filter(User.email == email).first()
     if not existing_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    new_token, max_age = create_access_token(existing_user.email, existing_user.role.role_name)
+    # a refresh always reflects the current row, not a cached principal
+    invalidate_principal(existing_user.id)
+    new_token, max_age = create_access_token(
+        existing_user.id, existing_user.email, existing_user.role.role_name
+    )
     response.set_cookie(key="access_token", value=new_token, httponly=True, max_age=max_age)
 
     return {
@@ -1,4 +1,6 @@
 from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
 
 
 class StatsResponse(BaseModel):
@@ -9,4 +11,17 @@ class StatsResponse(BaseModel):
     total_comment_likes: int
     flagged_blogs: int
     flagged_comments: int
-    total_roles: int
\ No newline at end of file
+    total_roles: int
+    users_by_role: Dict[str, int] = {}
+
+
+class TimeSeriesPoint(BaseModel):
+    bucket_start: datetime
+    value: int
+
+
+class TimeSeriesResponse(BaseModel):
+    metric: str
+    bucket: str
+    rolled_until: Optional[datetime] = None
+    points: List[TimeSeriesPoint]
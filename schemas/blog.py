@@ -17,6 +17,33 @@ class BlogRead(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     owner_id: int
+    likes_count: int = 0
+
+
+class BlogSummary(BaseModel):
+    id: int
+    title: str
+    excerpt: Optional[str] = None
+    main_image_url: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    owner_id: int
+    likes_count: int = 0
+
+
+class BlogSearchResult(BlogSummary):
+    rank: float
+    snippet: Optional[str] = None
+
+
+class BlogTrending(BlogSummary):
+    hot_score: float
+
+
+class BlogViewsRead(BaseModel):
+    blog_id: int
+    view_count: int
+    unique_viewers: int
 
 
 class BlogUpdate(BaseModel):
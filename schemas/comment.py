@@ -15,6 +15,13 @@ class CommentRead(BaseModel):
     updated_at: Optional[datetime] = None
     owner_id: int
     parent_id: Optional[int]
+    likes_count: int = 0
+
+
+class CommentNode(CommentRead):
+    depth: int
+    reply_count: int
+    replies: List["CommentNode"] = []
 
 
 class CommentUpdate(BaseModel):
@@ -1,14 +1,38 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Optional
+from datetime import datetime
 
 
 class BlogLikeResponse(BaseModel):
     blog_id: int
     likes_count: int
-    user_ids: List[int]
 
 
 class CommentLikeResponse(BaseModel):
     comment_id: int
     likes_count: int
-    user_ids: List[int]
+
+
+class LikeToggleResponse(BaseModel):
+    message: str
+    liked: bool
+    likes_count: int
+
+
+class BlogViewerState(BaseModel):
+    blog_id: int
+    likes_count: int
+    comments_count: int
+    liked: bool
+
+
+class CommentViewerState(BaseModel):
+    comment_id: int
+    likes_count: int
+    reply_count: int
+    liked: bool
+
+
+class LikerRead(BaseModel):
+    user_id: int
+    liked_at: Optional[datetime] = None
@@ -1,18 +1,22 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
+from typing import List, Optional
 
 
 class RoleCreate(BaseModel):
     role_name: str = Field(...)
+    permissions: Optional[List[str]] = Field(None, examples=[["COMMENT", "FLAG"]])
 
 
 class RoleRead(BaseModel):
     id: int
     role_name: str
     created_at: datetime
+    permissions: List[str] = Field(validation_alias="permission_names")
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class RoleUpdate(BaseModel):
-    role_name: str
+    role_name: Optional[str] = None
+    permissions: Optional[List[str]] = None
@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+import pytest
+
+# The app configures its engines at import time, so point it at a throwaway
+# SQLite file before anything imports config.session.
+_database_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_database_dir.name}/test.db"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+# the tuned profile's explicit BEGIN would count against every query budget
+os.environ["SQLITE_PROFILE"] = "default"
+os.environ.setdefault("HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("SLOW_QUERY_MS", "0")
+
+from fastapi.testclient import TestClient
+
+import main
+from config.session import SessionLocal
+from models import Blog, Comment, Role, User
+from utils.cache import object_cache
+from utils.hashing import create_access_token
+from utils.principal import principal_cache
+
+ROLES = ["admin", "guest", "moderator", "author", "user"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    with SessionLocal() as db:
+        for role_id, name in enumerate(ROLES, start=1):
+            db.add(Role(id=role_id, role_name=name))
+        db.commit()
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def author(client):
+    """Id and auth headers of a user with the author role."""
+    with SessionLocal() as db:
+        user = User(email="author@example.com", password="-", name="author", role_id=4)
+        db.add(user)
+        db.commit()
+    token, _ = create_access_token(user.id, user.email, "author")
+    return user.id, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def blog_id(author):
+    """A blog with a page and a half of threads, each three replies deep,
+    among a page and a half of other blogs."""
+    owner_id, _ = author
+    with SessionLocal() as db:
+        blogs = [
+            Blog(title=f"post {i}", content="lorem ipsum " * 50, owner_id=owner_id)
+            for i in range(30)
+        ]
+        db.add_all(blogs)
+        db.flush()
+        blog = blogs[0]
+        for i in range(30):
+            parent = None
+            for depth in range(3):
+                comment = Comment(
+                    content=f"comment {i}.{depth}",
+                    owner_id=owner_id,
+                    blog_id=blog.id,
+                    parent_id=parent.id if parent else None,
+                )
+                db.add(comment)
+                db.flush()
+                parent = comment
+        db.commit()
+        return blog.id
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    """Every test starts with empty in-process caches, so it sees the queries
+    a cache miss runs."""
+    object_cache.clear()
+    principal_cache.clear()
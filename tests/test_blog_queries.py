@@ -0,0 +1,69 @@
+"""Query budgets for the hot read routes.
+
+Each request runs against cold caches and must stay at a fixed number of
+statements however many rows it returns, so a lazy load or a per-row query
+added to one of these routes fails here.
+"""
+
+import pytest
+
+from utils.query_budget import query_budget
+
+
+@pytest.mark.parametrize("params", [{}, {"limit": 100}])
+def test_blog_list(client, blog_id, params):
+    with query_budget(1, route="/blogs/") as recorded:
+        page = client.get("/blogs/", params=params).json()
+        client.get("/blogs/", params={**params, "cursor": page["next_cursor"]})
+    assert len(recorded) == 2
+
+
+def test_blog(client, blog_id):
+    with query_budget(1, route="/blogs/{blog_id}"):
+        assert client.get(f"/blogs/{blog_id}").status_code == 200
+
+
+def test_cached_blog_runs_no_queries(client, blog_id):
+    client.get(f"/blogs/{blog_id}")
+    with query_budget(0, route="/blogs/{blog_id}"):
+        assert client.get(f"/blogs/{blog_id}").status_code == 200
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest", "top"])
+@pytest.mark.parametrize("limit", [20, 100])
+def test_comments(client, blog_id, sort, limit):
+    with query_budget(3, route="/blogs/{blog_id}/comments") as recorded:
+        response = client.get(
+            f"/blogs/{blog_id}/comments", params={"sort": sort, "limit": limit}
+        )
+    assert response.status_code == 200
+    assert len(recorded) == 1
+
+
+@pytest.mark.parametrize("params", [{}, {"depth": 20, "limit": 100}])
+def test_comment_tree(client, blog_id, params):
+    with query_budget(2, route="/blogs/{blog_id}/comments/tree"):
+        response = client.get(f"/blogs/{blog_id}/comments/tree", params=params)
+    assert response.status_code == 200
+    assert response.json()["items"][0]["replies"]
+
+
+def test_comment_tree_next_page(client, blog_id):
+    page = client.get(f"/blogs/{blog_id}/comments/tree").json()
+    with query_budget(2, route="/blogs/{blog_id}/comments/tree"):
+        response = client.get(
+            f"/blogs/{blog_id}/comments/tree", params={"cursor": page["next_cursor"]}
+        )
+    assert len(response.json()["items"]) == 10
+    assert response.json()["next_cursor"] is None
+
+
+@pytest.mark.parametrize("signed_in, budget", [(False, 1), (True, 3)])
+def test_blogs_state(client, author, blog_id, signed_in, budget):
+    _, headers = author
+    ids = list(range(blog_id, blog_id + 30))
+    with query_budget(budget, route="/blogs/state"):
+        response = client.get(
+            "/blogs/state", params={"ids": ids}, headers=headers if signed_in else {}
+        )
+    assert len(response.json()) == 30
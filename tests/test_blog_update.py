@@ -0,0 +1,10 @@
+def test_null_content_is_rejected(client, author):
+    _, headers = author
+    blog = client.post(
+        "/blogs/", headers=headers, json={"title": "nullable", "content": "body"}
+    ).json()
+    response = client.patch(
+        f"/blogs/{blog['id']}", headers=headers, json={"content": None}
+    )
+    assert response.status_code == 400
+
@@ -0,0 +1,60 @@
+import pytest
+
+
+@pytest.fixture
+def thread(client, author):
+    """A fresh blog with two top-level comments."""
+    _, headers = author
+    blog = client.post(
+        "/blogs/", headers=headers, json={"title": "validators", "content": "body"}
+    ).json()
+    comments = [
+        client.post(
+            f"/blogs/{blog['id']}/comments", headers=headers, json={"content": text}
+        ).json()
+        for text in ("first", "second")
+    ]
+    return blog["id"], [comment["id"] for comment in comments]
+
+
+def etag(client, blog_id, sort="top"):
+    response = client.get(f"/blogs/{blog_id}/comments", params={"sort": sort})
+    assert "last-modified" not in response.headers
+    return response.headers["etag"]
+
+
+def test_moving_a_like_changes_the_etag(client, author, thread):
+    _, headers = author
+    blog_id, (first, second) = thread
+    client.post(f"/comments/{first}/like", headers=headers)
+    liked_first = etag(client, blog_id)
+
+    client.post(f"/comments/{first}/like", headers=headers)
+    client.post(f"/comments/{second}/like", headers=headers)
+    liked_second = etag(client, blog_id)
+
+    assert liked_second != liked_first
+    response = client.get(
+        f"/blogs/{blog_id}/comments",
+        params={"sort": "top"},
+        headers={"If-None-Match": liked_first},
+    )
+    assert response.status_code == 200
+
+
+def test_delete_changes_the_etag(client, author, thread):
+    _, headers = author
+    blog_id, (first, _) = thread
+    before = etag(client, blog_id, sort="newest")
+    client.delete(f"/comments/{first}", headers=headers)
+    assert etag(client, blog_id, sort="newest") != before
+
+
+def test_unchanged_list_is_not_modified(client, thread):
+    blog_id, _ = thread
+    response = client.get(
+        f"/blogs/{blog_id}/comments",
+        params={"sort": "top"},
+        headers={"If-None-Match": etag(client, blog_id)},
+    )
+    assert response.status_code == 304
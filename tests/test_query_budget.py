@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import text
+
+from config.session import SessionLocal
+from utils.query_budget import query_budget
+
+
+def test_records_requests_within_budget(client):
+    with query_budget(10) as recorded:
+        client.get("/blogs/")
+    assert [label for label, _ in recorded] == ["GET /blogs/"]
+
+
+def test_fails_a_request_over_budget(client):
+    over_budget = pytest.raises(
+        AssertionError, match=r"GET /blogs/ ran \d+ queries, budget is 0"
+    )
+    with over_budget, query_budget(0):
+        client.get("/blogs/")
+
+
+def test_only_checks_the_given_route(client):
+    with query_budget(0, route="/blogs/trending") as recorded:
+        client.get("/blogs/")
+    assert recorded == []
+
+
+def test_counts_queries_run_in_the_block():
+    over_budget = pytest.raises(
+        AssertionError, match="block ran 2 queries, budget is 1"
+    )
+    with over_budget, query_budget(1), SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 1"))
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from config.session import SessionLocal
+from models import Blog
+from utils.rollups import HOUR, read_series, roll_up
+
+LATE_HOUR = datetime(2020, 1, 1, 5, tzinfo=timezone.utc)
+
+
+def blogs_in_late_hour(db):
+    [(_, value)], _ = read_series(db, "blogs", LATE_HOUR, LATE_HOUR + HOUR, HOUR)
+    return value
+
+
+def test_late_rows_are_backfilled_and_deleted_rows_dropped(author):
+    owner_id, _ = author
+    with SessionLocal() as db:
+        roll_up(db)
+        # a second run rewrites the same buckets in place
+        roll_up(db)
+
+        blog = Blog(
+            title="late",
+            content="committed long after its hour",
+            owner_id=owner_id,
+            created_at=LATE_HOUR + timedelta(minutes=30),
+        )
+        db.add(blog)
+        db.commit()
+
+        roll_up(db)
+        assert blogs_in_late_hour(db) == 0
+        roll_up(db, full=True)
+        assert blogs_in_late_hour(db) == 1
+
+        db.delete(blog)
+        db.commit()
+        roll_up(db, full=True)
+        assert blogs_in_late_hour(db) == 0
@@ -0,0 +1,19 @@
+def test_blank_query_is_rejected(client):
+    response = client.get("/blogs/search", params={"q": "   "})
+    assert response.status_code == 422
+
+
+def test_snippet_escapes_content(client, author):
+    _, headers = author
+    client.post(
+        "/blogs/",
+        headers=headers,
+        json={
+            "title": "escaping",
+            "content": "zebra <img src=x onerror=alert(1)> crossing",
+        },
+    )
+    [result] = client.get("/blogs/search", params={"q": "zebra"}).json()["items"]
+    assert result["snippet"] == (
+        "<mark>zebra</mark> &lt;img src=x onerror=alert(1)&gt; crossing"
+    )
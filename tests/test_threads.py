@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from config.session import SessionLocal
+from models import Blog, Comment
+from utils.threads import blog_comment_ids, load_thread, thread_ids
+
+
+def test_thread_ids_cover_the_whole_subtree(client, author):
+    _, headers = author
+    blog_id = client.post(
+        "/blogs/", headers=headers, json={"title": "subtree", "content": "body"}
+    ).json()["id"]
+
+    def comment(parent_id=None):
+        return client.post(
+            f"/blogs/{blog_id}/comments",
+            headers=headers,
+            json={"content": "reply", "parent_id": parent_id},
+        ).json()["id"]
+
+    root = comment()
+    child = comment(root)
+    grandchild = comment(child)
+    sibling = comment()
+
+    with SessionLocal() as db:
+        assert sorted(thread_ids(db, root)) == [root, child, grandchild]
+        assert sorted(thread_ids(db, child)) == [child, grandchild]
+        assert sorted(blog_comment_ids(db, blog_id)) == [
+            root,
+            child,
+            grandchild,
+            sibling,
+        ]
+
+
+def test_reply_older_than_its_parent_is_kept(author):
+    owner_id, _ = author
+    with SessionLocal() as db:
+        blog = Blog(title="skew", content="body", owner_id=owner_id)
+        db.add(blog)
+        db.flush()
+        now = datetime.now(timezone.utc)
+        roots = [
+            Comment(content=f"root {i}", owner_id=owner_id, blog_id=blog.id)
+            for i in range(2)
+        ]
+        roots[0].created_at = now
+        roots[1].created_at = now + timedelta(seconds=1)
+        db.add_all(roots)
+        db.flush()
+        # e.g. written by an app server whose clock runs behind
+        reply = Comment(
+            content="reply",
+            owner_id=owner_id,
+            blog_id=blog.id,
+            parent_id=roots[0].id,
+            created_at=now - timedelta(minutes=5),
+        )
+        db.add(reply)
+        db.commit()
+
+        page, has_more = load_thread(db, blog.id, depth=2, limit=1)
+
+    assert has_more
+    [root] = page
+    assert root["id"] == roots[0].id
+    assert [node["id"] for node in root["replies"]] == [reply.id]
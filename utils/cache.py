@@ -0,0 +1,276 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+load_dotenv()
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 300))
+# With read replicas a load right after an invalidation may still see the old
+# row, so invalidated keys are not cached again until replicas caught up.
+CACHE_SETTLE_SECONDS = float(
+    os.getenv(
+        "CACHE_SETTLE_SECONDS",
+        os.getenv("REPLICA_PIN_SECONDS", 5)
+        if os.getenv("DATABASE_REPLICA_URLS")
+        else 0,
+    )
+)
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """Interface for object caches; subclasses provide _get/_set/_delete/_clear.
+
+    ``get_or_load`` is the read-through entry point. Every invalidation bumps
+    an epoch, and a value loaded while an invalidation happened is not stored,
+    so a reader racing a writer can never repopulate the cache with the row
+    the writer just replaced. With ``settle_seconds`` an invalidated key also
+    stays uncached for that long, covering readers served by a lagging replica.
+    The epoch, the settling keys and the check-and-store of a loaded value
+    share one lock, so an invalidation is never interleaved with that store.
+    """
+
+    def __init__(self, settle_seconds: float = CACHE_SETTLE_SECONDS):
+        self._epoch = 0
+        self.settle_seconds = settle_seconds
+        self._settling: dict = {}
+        self._epoch_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._get(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._set(key, value, ttl)
+
+    def delete(self, *keys: Hashable) -> None:
+        with self._epoch_lock:
+            self._epoch += 1
+            if self.settle_seconds:
+                now = time.monotonic()
+                if len(self._settling) > 1024:
+                    self._settling = {
+                        key: until
+                        for key, until in self._settling.items()
+                        if until > now
+                    }
+                self._settling.update(dict.fromkeys(keys, now + self.settle_seconds))
+        for key in keys:
+            self._delete(key)
+
+    def clear(self) -> None:
+        with self._epoch_lock:
+            self._epoch += 1
+        self._clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self._get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        epoch = self._epoch
+        value = loader()
+        if value is not None:
+            with self._epoch_lock:
+                if epoch == self._epoch and not self._is_settling(key):
+                    self._set(key, value, None)
+        return value
+
+    async def get_or_load_async(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """``get_or_load`` for a coroutine ``loader``, e.g. an AsyncSession query."""
+        value = self._get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        epoch = self._epoch
+        value = await loader()
+        if value is not None:
+            with self._epoch_lock:
+                if epoch == self._epoch and not self._is_settling(key):
+                    self._set(key, value, None)
+        return value
+
+    def _is_settling(self, key: Hashable) -> bool:
+        # called with _epoch_lock held
+        until = self._settling.get(key)
+        return until is not None and until > time.monotonic()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    def _get(self, key):
+        return _MISSING
+
+    def _set(self, key, value, ttl):
+        pass
+
+    def _delete(self, key):
+        pass
+
+    def _clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+        settle_seconds: float = CACHE_SETTLE_SECONDS,
+    ):
+        super().__init__(settle_seconds)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def build_cache(backend: str = CACHE_BACKEND, **options) -> CacheBackend:
+    if backend == "none":
+        return NullCache()
+    if backend == "memory":
+        return LRUCache(**options)
+    raise ValueError(f"Unknown cache backend '{backend}'")
+
+
+object_cache = build_cache()
+
+
+# ------------------------------ ORM read-through ------------------------------
+
+
+def object_key(model, pk) -> tuple:
+    return (model.__tablename__, pk)
+
+
+def _snapshot(instance) -> dict:
+    state = inspect(instance)
+    # deferred columns stay out of the cache and load on access as usual
+    return {
+        attr.key: getattr(instance, attr.key)
+        for attr in state.mapper.column_attrs
+        if attr.key not in state.unloaded
+    }
+
+
+def cached_get(db: Session, model, pk):
+    """Session-bound instance of ``model`` by primary key, cached across requests.
+
+    A cache hit is attached to ``db`` without a SELECT, so callers may read,
+    modify or delete it like any other loaded instance.
+    """
+    loaded = []
+
+    def load():
+        instance = db.get(model, pk)
+        loaded.append(instance)
+        return _snapshot(instance) if instance is not None else None
+
+    values = object_cache.get_or_load(object_key(model, pk), load)
+    if loaded:
+        return loaded[0]
+    if values is None:
+        return None
+
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
+
+
+async def cached_values(db: AsyncSession, model, pk) -> Optional[dict]:
+    """Column values of ``model`` by primary key, shared with ``cached_get``.
+
+    Async routes only read, so they get the plain cached dict and never an
+    instance bound to ``db``.
+    """
+
+    async def load():
+        instance = await db.get(model, pk)
+        return _snapshot(instance) if instance is not None else None
+
+    return await object_cache.get_or_load_async(object_key(model, pk), load)
+
+
+def invalidate(model, *pks) -> None:
+    object_cache.delete(*(object_key(model, pk) for pk in pks))
@@ -0,0 +1,183 @@
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import String, cast, delete, func, insert, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config.session import SessionLocal
+from models import (
+    Blog,
+    BlogLike,
+    Comment,
+    CommentLike,
+    FlaggedBlog,
+    FlaggedComment,
+    PlatformCounter,
+    Role,
+    User,
+)
+from models.platform_counter import ROLE_COUNTER_PREFIX, SEED_COUNTERS_SQL
+from utils.cache import object_cache
+
+
+def _insert_ignore(db: Session, table, values: dict) -> int:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(table).values(values).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).values(values).on_conflict_do_nothing()
+    else:
+        statement = insert(table).values(values).prefix_with("IGNORE")
+    return db.execute(statement).rowcount
+
+
+def toggle_like(
+    db: Session,
+    like_table,
+    target_model,
+    target_column: str,
+    target_id: int,
+    user_id: int,
+) -> Optional[Tuple[bool, int]]:
+    """Flip ``user_id``'s like on a target and return ``(liked, likes_count)``.
+
+    Only the single (user, target) row is touched: a DELETE, and if nothing
+    was deleted an INSERT that ignores conflicts. The counter moves by the
+    number of rows actually changed, so concurrent toggles (double-clicks,
+    retries) can never drift it. Returns None if the target does not exist;
+    the caller owns the transaction.
+    """
+    removed = db.execute(
+        delete(like_table).where(
+            like_table.c.user_id == user_id,
+            like_table.c[target_column] == target_id,
+        )
+    ).rowcount
+    if removed:
+        liked, delta = False, -removed
+    else:
+        liked = True
+        delta = _insert_ignore(
+            db, like_table, {"user_id": user_id, target_column: target_id}
+        )
+
+    if delta:
+        likes_count = db.execute(
+            update(target_model)
+            .where(target_model.id == target_id)
+            .values(likes_count=target_model.likes_count + delta)
+            .returning(target_model.likes_count)
+        ).scalar_one_or_none()
+    else:
+        likes_count = db.execute(
+            select(target_model.likes_count).where(target_model.id == target_id)
+        ).scalar_one_or_none()
+
+    if likes_count is None:
+        return None
+    return liked, likes_count
+
+
+def recount_likes(db: Session) -> None:
+    """Recompute every like counter from the blog_likes/comment_likes rows."""
+    db.execute(
+        update(Blog).values(
+            likes_count=select(func.count())
+            .where(BlogLike.c.blog_id == Blog.id)
+            .scalar_subquery()
+        )
+    )
+    db.execute(
+        update(Comment).values(
+            likes_count=select(func.count())
+            .where(CommentLike.c.comment_id == Comment.id)
+            .scalar_subquery()
+        )
+    )
+
+
+# StatsResponse field -> (platform counter name, counted table)
+PLATFORM_STATS = {
+    "total_users": ("users", User.__table__),
+    "total_blog_posts": ("blogs", Blog.__table__),
+    "total_blog_likes": ("blog_likes", BlogLike),
+    "total_comments": ("comments", Comment.__table__),
+    "total_comment_likes": ("comment_likes", CommentLike),
+    "flagged_blogs": ("flagged_blogs", FlaggedBlog.__table__),
+    "flagged_comments": ("flagged_comments", FlaggedComment.__table__),
+    "total_roles": ("roles", Role.__table__),
+}
+
+
+def exact_stats(db: Session) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Platform totals and users per role, counted from the tables themselves.
+
+    Every total is a COUNT(*) subquery of a single SELECT, so the database
+    answers from its indexes in one round trip without shipping any rows.
+    """
+    totals = (
+        db.execute(
+            select(
+                *(
+                    select(func.count())
+                    .select_from(table)
+                    .scalar_subquery()
+                    .label(field)
+                    for field, (_, table) in PLATFORM_STATS.items()
+                )
+            )
+        )
+        .one()
+        ._asdict()
+    )
+    by_role = db.execute(
+        select(Role.role_name, func.count(User.id))
+        .outerjoin(User, User.role_id == Role.id)
+        .group_by(Role.id, Role.role_name)
+    ).all()
+    return totals, dict(by_role)
+
+
+def counter_stats(db: Session) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Same as ``exact_stats`` but read from the trigger-maintained counters.
+
+    The counters table holds a few rows per total regardless of how large the
+    counted tables grow, so this stays constant-time.
+    """
+    counters = dict(
+        db.execute(
+            select(PlatformCounter.name, func.sum(PlatformCounter.value))
+            .where(
+                PlatformCounter.name.in_([name for name, _ in PLATFORM_STATS.values()])
+            )
+            .group_by(PlatformCounter.name)
+        ).all()
+    )
+    totals = {
+        field: int(counters.get(name) or 0)
+        for field, (name, _) in PLATFORM_STATS.items()
+    }
+
+    role_counter = literal(ROLE_COUNTER_PREFIX) + cast(Role.id, String)
+    by_role = db.execute(
+        select(Role.role_name, func.coalesce(func.sum(PlatformCounter.value), 0))
+        .outerjoin(PlatformCounter, PlatformCounter.name == role_counter)
+        .group_by(Role.id, Role.role_name)
+    ).all()
+    return totals, {role_name: int(value) for role_name, value in by_role}
+
+
+def recount_platform_counters(db: Session) -> None:
+    """Rebuild the platform counters from exact counts."""
+    for statement in SEED_COUNTERS_SQL:
+        db.execute(text(statement))
+
+
+if __name__ == "__main__":
+    # python -m utils.counters
+    with SessionLocal() as db:
+        recount_likes(db)
+        recount_platform_counters(db)
+        db.commit()
+    object_cache.clear()
+    print("Like and platform counters recomputed.")
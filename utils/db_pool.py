@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from utils.histogram import Histogram
+from utils.request_context import current_request
+
+logger = logging.getLogger(__name__)
+
+# at most one exhaustion warning per pool per interval
+EXHAUSTION_LOG_INTERVAL_SECONDS = 1.0
+
+
+class PoolTelemetry:
+    def __init__(self):
+        self.checkouts = 0
+        # checkouts that found no idle connection
+        self.misses = 0
+        # checkouts that had to queue because the pool and overflow were full
+        self.exhausted = 0
+        self.timeouts = 0
+        self.checkout_seconds = Histogram()
+        self._last_logged = 0.0
+        self._unlogged = 0
+        self._lock = threading.Lock()
+
+    def should_log(self) -> int:
+        """Number of exhaustion events to report now, 0 to stay quiet."""
+        now = time.monotonic()
+        with self._lock:
+            self._unlogged += 1
+            if now - self._last_logged < EXHAUSTION_LOG_INTERVAL_SECONDS:
+                return 0
+            self._last_logged = now
+            events, self._unlogged = self._unlogged, 0
+            return events
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout and reports requests left waiting on a full pool."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.telemetry = PoolTelemetry()
+
+    def _do_get(self):
+        telemetry = self.telemetry
+        idle = self._pool.qsize()
+        full = -1 < self._max_overflow <= self._overflow
+        if not idle:
+            telemetry.misses += 1
+            if full:
+                telemetry.exhausted += 1
+                self._log_exhaustion()
+
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            telemetry.timeouts += 1
+            raise
+        finally:
+            telemetry.checkout_seconds.observe(time.perf_counter() - started)
+        telemetry.checkouts += 1
+        return record
+
+    @property
+    def name(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def _log_exhaustion(self) -> None:
+        events = self.telemetry.should_log()
+        if not events:
+            return
+        context = current_request.get()
+        logger.warning(
+            "Connection pool '%s' exhausted (%d checked out, %d events since last "
+            "report); %s is waiting up to %.1fs",
+            self.name,
+            self.checkedout(),
+            events,
+            f"{context.method} {context.route}" if context else "a background task",
+            self._timeout,
+        )
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+    def stats(self) -> dict:
+        telemetry = self.telemetry
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self._timeout,
+            "recycle_seconds": self._recycle,
+            "pre_ping": self._pre_ping,
+            "checkouts": telemetry.checkouts,
+            "misses": telemetry.misses,
+            "exhausted": telemetry.exhausted,
+            "timeouts": telemetry.timeouts,
+            "checkout_seconds": telemetry.checkout_seconds.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(*engines) -> dict:
+    stats = {}
+    for index, engine in enumerate(engines):
+        pool = engine.pool
+        if isinstance(pool, InstrumentedPoolMixin):
+            stats[pool.name] = pool.stats()
+        else:
+            stats[str(index)] = {"pool": type(pool).__name__, "status": pool.status()}
+    return stats
@@ -1,51 +1,200 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional, Tuple
 from dotenv import load_dotenv
+import hashlib
+import multiprocessing
 import os
-from fastapi import HTTPException
+import threading
+import time
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from utils.cache import LRUCache
 
 load_dotenv()
 
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 SECRET_KEY = os.getenv("SECRET_KEY", "DEFAULT_ALT_FOR_SECRET_KEY")
 ACCESS_TOKEN_EXPIRES_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRES_MINUTES", 60))
+# existing hashes with a different cost are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# 0 hashes on the request threadpool instead of worker processes
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", max(HASH_WORKERS, 1) * 4))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
 
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
 
-def hash_password(plain_password: str) -> str:
+
+class HashingPool:
+    """Runs password hashing on a dedicated pool of worker processes.
+
+    ``run`` is awaited on the event loop, so a hash in progress holds no
+    request thread. At most ``queue_depth`` hashes may be running or queued
+    at once; callers beyond that get an immediate 503 instead of waiting
+    behind a login burst.
+    """
+
+    def __init__(
+        self, workers: int = HASH_WORKERS, queue_depth: int = HASH_QUEUE_DEPTH
+    ):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawned, not forked: the app process already runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.in_flight += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            try:
+                return await asyncio.wrap_future(self._pool().submit(fn, *args))
+            except BrokenProcessPool:
+                # a worker died; start a fresh pool for the next caller
+                with self._lock:
+                    self._executor = None
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Password hashing is restarting, try again shortly.",
+                    headers={"Retry-After": "1"},
+                )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def start(self) -> None:
+        """Spawn the workers up front so the first sign-ins don't wait for them."""
+        if self.workers > 0:
+            pool = self._pool()
+            for _ in range(self.workers):
+                pool.submit(os.getpid)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+        }
+
+
+hashing_pool = HashingPool()
+
+# verified token payloads; each entry expires with its token
+token_cache = LRUCache(max_entries=TOKEN_CACHE_MAX_ENTRIES, settle_seconds=0)
+
+
+# run in the worker processes, so they must be importable module-level functions
+def _hash(plain_password: str) -> str:
+    return pwd_context.hash(plain_password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def hash_password(plain_password: str) -> str:
     if not plain_password:
         raise ValueError("Password cannot be empty")
-    return pwd_context.hash(plain_password)
+    return await hashing_pool.run(_hash, plain_password)
+
 
+async def verify_password(plain_password, hashed_password) -> bool:
+    return (await verify_and_update_password(plain_password, hashed_password))[0]
 
-def verify_password(plain_password, hashed_password) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Check a password; also returns a new hash when the stored one is outdated."""
+    return await hashing_pool.run(_verify_and_update, plain_password, hashed_password)
 
 
 def create_access_token(
-    email: str, role: str, expires_delta: Optional[timedelta] = None
+    user_id: int, email: str, role: str, expires_delta: Optional[timedelta] = None
 ):
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRES_MINUTES)
     )
     iat = datetime.now(timezone.utc)
 
-    to_encode = {"email": email, "role": role, "exp": expire, "iat": iat}
+    to_encode = {
+        "sub": str(user_id),
+        "email": email,
+        "role": role,
+        "exp": expire,
+        "iat": iat,
+    }
     max_age = int((expire - datetime.now(timezone.utc)).total_seconds())
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt, max_age
 
 
 def decode_access_token(token: str):
+    """Verified payload of ``token``; raises 401 if it is invalid or expired.
+
+    Verified payloads are cached under a digest of the token until its
+    ``exp``, so a session's repeat requests skip signature verification. A
+    tampered token hashes to a different key and is verified from scratch.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=401,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_cache.set(key, payload, ttl=expires_in)
+    return payload
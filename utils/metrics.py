@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.histogram import Histogram
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+def _number(value) -> str:
+    if value is None:
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def family(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[Tuple[Dict[str, object], object]],
+) -> List[str]:
+    """Prometheus text-format lines for one metric family."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(
+        f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples
+    )
+    return lines
+
+
+def histogram_family(
+    name: str, help_text: str, snapshots: Iterable[Tuple[Dict[str, object], dict]]
+) -> List[str]:
+    """Lines for ``Histogram.snapshot()`` results, one series per label set."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, snapshot in snapshots:
+        for bound, count in snapshot["buckets"].items():
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(float(snapshot['sum']))}")
+        lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+def merge_snapshots(snapshots: List[dict]) -> dict:
+    merged = {"buckets": defaultdict(int), "count": 0, "sum": 0.0, "max": 0.0}
+    for snapshot in snapshots:
+        for bound, count in snapshot["buckets"].items():
+            merged["buckets"][bound] += count
+        merged["count"] += snapshot["count"]
+        merged["sum"] += snapshot["sum"]
+        merged["max"] = max(merged["max"], snapshot["max"])
+    return merged
+
+
+class _Shard:
+    """Counters written by one thread only, so recording takes no shared lock."""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.db_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.db_statements: Dict[Tuple[str, str], int] = defaultdict(int)
+
+
+class RequestMetrics:
+    """Per-route request counts, latencies and DB time, aggregated per thread.
+
+    Each recording thread (normally just the event loop's) owns a shard; a
+    scrape sums the shards. Reading a shard while its owner writes may miss
+    the request in progress, never corrupt a total.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def record(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        db_seconds: float = 0.0,
+        db_statements: int = 0,
+    ) -> None:
+        shard = self._shard()
+        key = (method, route)
+        shard.requests[(method, route, status)] += 1
+        latency = shard.latency.get(key)
+        if latency is None:
+            latency = shard.latency[key] = Histogram()
+        latency.observe(seconds)
+        if db_statements:
+            shard.db_seconds[key] += db_seconds
+            shard.db_statements[key] += db_statements
+
+    def render(self) -> List[str]:
+        with self._lock:
+            shards = list(self._shards)
+        requests: Dict[tuple, int] = defaultdict(int)
+        latency: Dict[tuple, List[dict]] = defaultdict(list)
+        db_seconds: Dict[tuple, float] = defaultdict(float)
+        db_statements: Dict[tuple, int] = defaultdict(int)
+        for shard in shards:
+            for key, count in list(shard.requests.items()):
+                requests[key] += count
+            for key, histogram in list(shard.latency.items()):
+                latency[key].append(histogram.snapshot())
+            for key, seconds in list(shard.db_seconds.items()):
+                db_seconds[key] += seconds
+            for key, count in list(shard.db_statements.items()):
+                db_statements[key] += count
+
+        def route_labels(key):
+            return {"method": key[0], "route": key[1]}
+
+        return [
+            *family(
+                "http_requests_total",
+                "counter",
+                "HTTP requests by route and status.",
+                (
+                    ({"method": method, "route": route, "status": status}, count)
+                    for (method, route, status), count in sorted(requests.items())
+                ),
+            ),
+            *histogram_family(
+                "http_request_duration_seconds",
+                "Time to serve a request, by route.",
+                (
+                    (route_labels(key), merge_snapshots(snapshots))
+                    for key, snapshots in sorted(latency.items())
+                ),
+            ),
+            *family(
+                "http_requests_in_flight",
+                "gauge",
+                "Requests being served right now.",
+                [({}, self.in_flight)],
+            ),
+            *family(
+                "http_request_db_seconds_total",
+                "counter",
+                "Time spent in SQL statements, by route.",
+                (
+                    (route_labels(key), value)
+                    for key, value in sorted(db_seconds.items())
+                ),
+            ),
+            *family(
+                "http_request_db_statements_total",
+                "counter",
+                "SQL statements run, by route.",
+                (
+                    (route_labels(key), value)
+                    for key, value in sorted(db_statements.items())
+                ),
+            ),
+        ]
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """Records every HTTP request into ``request_metrics``.
+
+    Routes are labelled by their path template, and requests that matched no
+    route share one label, so the number of series stays bounded.
+    """
+
+    def __init__(self, app, metrics: Optional[RequestMetrics] = None):
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight -= 1
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            queries = scope.get("query_stats")
+            metrics.record(
+                scope["method"],
+                route,
+                status,
+                elapsed,
+                queries.db_seconds if queries else 0.0,
+                queries.statements if queries else 0,
+            )
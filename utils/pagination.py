@@ -0,0 +1,141 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT = "next"
+PREV = "prev"
+
+
+def _dump(value: Any):
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    return value
+
+
+def _load(value: Any):
+    if isinstance(value, dict) and "t" in value:
+        return datetime.fromisoformat(value["t"])
+    return value
+
+
+def encode_cursor(direction: str, key: Sequence[Any]) -> str:
+    raw = json.dumps(
+        {"d": direction, "k": [_dump(value) for value in key]}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data["d"]
+        key = [_load(value) for value in data["k"]]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    if direction not in (NEXT, PREV):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return direction, key
+
+
+def row_pivot(pk_column, *columns, where=()):
+    """Resolve a cursor key against the stored values of its boundary row.
+
+    ``columns`` are the sort columns preceding ``pk_column``, whose value must
+    be the last key element; ``where`` narrows the lookup for composite keys.
+    Comparing against the row itself keeps timestamps exact on backends that
+    store them as text; the values carried in the cursor are only used if
+    that row has been deleted.
+    """
+
+    def resolve(key: List[Any]) -> List[Any]:
+        *values, pk = key
+        bound = [
+            func.coalesce(
+                select(column).where(pk_column == pk, *where).scalar_subquery(), value
+            )
+            for column, value in zip(columns, values)
+        ]
+        return [*bound, pk]
+
+    return resolve
+
+
+def _bounded(query, order_by, limit, cursor, descending, resolve):
+    direction, key = decode_cursor(cursor) if cursor else (NEXT, None)
+    backwards = direction == PREV
+    ascending = descending == backwards
+
+    if key is not None:
+        columns = tuple_(*order_by)
+        bound = tuple_(*(resolve(key) if resolve else key))
+        query = query.filter(columns > bound if ascending else columns < bound)
+
+    query = query.order_by(
+        *[column.asc() if ascending else column.desc() for column in order_by]
+    ).limit(limit + 1)
+    return query, key, backwards
+
+
+def _page(rows, key, backwards, limit, key_of):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = encode_cursor(NEXT, key_of(rows[-1]))
+        if (has_more and backwards) or (key is not None and not backwards):
+            prev_cursor = encode_cursor(PREV, key_of(rows[0]))
+
+    return {"items": rows, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
+
+def paginate(
+    query,
+    order_by: Sequence[Any],
+    key_of: Callable[[Any], Sequence[Any]],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    resolve: Optional[Callable[[List[Any]], Sequence[Any]]] = None,
+):
+    """Keyset pagination over ``order_by``; the last column must be unique.
+
+    Every page is a single index range scan of ``limit + 1`` rows, so the cost
+    does not grow with how far the client has paged.
+    """
+    query, key, backwards = _bounded(
+        query, order_by, limit, cursor, descending, resolve
+    )
+    return _page(query.all(), key, backwards, limit, key_of)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    statement,
+    order_by: Sequence[Any],
+    key_of: Callable[[Any], Sequence[Any]],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    resolve: Optional[Callable[[List[Any]], Sequence[Any]]] = None,
+):
+    """``paginate`` for a ``select()`` of ORM entities on an AsyncSession."""
+    statement, key, backwards = _bounded(
+        statement, order_by, limit, cursor, descending, resolve
+    )
+    rows = list((await db.scalars(statement)).all())
+    return _page(rows, key, backwards, limit, key_of)
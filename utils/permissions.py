@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.session import SessionLocal
+from models.role import Permission, Role
+
+load_dotenv()
+
+# other workers pick up role changes made elsewhere after at most this long
+ROLE_REGISTRY_TTL_SECONDS = float(os.getenv("ROLE_REGISTRY_TTL_SECONDS", 60))
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    names: Dict[int, str] = field(default_factory=dict)
+    ids: Dict[str, int] = field(default_factory=dict)
+    permissions: Dict[int, Permission] = field(default_factory=dict)
+
+
+class RoleRegistry:
+    """Role ids, names and permission bitsets, held in memory.
+
+    Route guards look roles up here instead of loading them per request. The
+    table is read at startup and again whenever ``routes/role.py`` changes it;
+    readers always see one complete snapshot, swapped in atomically.
+    """
+
+    def __init__(self, ttl: float = ROLE_REGISTRY_TTL_SECONDS):
+        self.ttl = ttl
+        self.loads = 0
+        self._snapshot: Optional[RoleSnapshot] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        # one refresh per expired TTL; callers arriving meanwhile wait for it
+        self._refresh_lock = threading.Lock()
+
+    def load(self, db: Session) -> RoleSnapshot:
+        roles = db.execute(select(Role)).scalars().all()
+        snapshot = RoleSnapshot(
+            names={role.id: role.role_name for role in roles},
+            ids={role.role_name: role.id for role in roles},
+            permissions={role.id: role.granted for role in roles},
+        )
+        with self._lock:
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + self.ttl
+            self.loads += 1
+        return snapshot
+
+    def reload(self) -> RoleSnapshot:
+        with SessionLocal() as db:
+            return self.load(db)
+
+    @property
+    def snapshot(self) -> RoleSnapshot:
+        with self._lock:
+            snapshot, expires_at = self._snapshot, self._expires_at
+        if snapshot is not None and time.monotonic() < expires_at:
+            return snapshot
+        with self._refresh_lock:
+            if self._snapshot is not snapshot:
+                return self._snapshot
+            return self.reload()
+
+    def name(self, role_id: int) -> Optional[str]:
+        return self.snapshot.names.get(role_id)
+
+    def id_of(self, role_name: str) -> Optional[int]:
+        return self.snapshot.ids.get(role_name)
+
+    def permissions(self, role_id: int) -> Permission:
+        return self.snapshot.permissions.get(role_id, Permission(0))
+
+    def allows(self, role_id: int, permission: Permission) -> bool:
+        return permission in self.permissions(role_id)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot or RoleSnapshot()
+        return {
+            "roles": len(snapshot.names),
+            "loads": self.loads,
+            "ttl_seconds": self.ttl,
+        }
+
+
+role_registry = RoleRegistry()
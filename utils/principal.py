@@ -0,0 +1,121 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import User
+from models.role import Permission
+from utils.cache import LRUCache
+from utils.permissions import role_registry
+
+load_dotenv()
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as the request sees it, detached from any session.
+
+    Carries what the auth dependencies and ``UserRead`` need, so handlers can
+    use it wherever they only read ``current_user``. The role's name and
+    permissions come from the role registry, so role edits apply at once.
+    """
+
+    id: int
+    email: str
+    name: str
+    role_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    @property
+    def role_name(self) -> Optional[str]:
+        return role_registry.name(self.role_id)
+
+    @property
+    def permissions(self) -> Permission:
+        return role_registry.permissions(self.role_id)
+
+
+# Entries are only invalidated in the process that made the change; the TTL
+# bounds how long another worker may keep serving a revoked role.
+principal_cache = LRUCache(
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def principal_key(user_id: int) -> Hashable:
+    return ("principal", user_id)
+
+
+def _user_id(payload: dict) -> Optional[int]:
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _principal_query(where):
+    return select(
+        User.id,
+        User.email,
+        User.name,
+        User.role_id,
+        User.created_at,
+        User.updated_at,
+    ).where(where)
+
+
+def _select_principal(db: Session, where) -> Optional[Principal]:
+    row = db.execute(_principal_query(where)).first()
+    return Principal(*row) if row is not None else None
+
+
+async def _select_principal_async(db: AsyncSession, where) -> Optional[Principal]:
+    row = (await db.execute(_principal_query(where))).first()
+    return Principal(*row) if row is not None else None
+
+
+def load_principal(db: Session, payload: Dict[str, Any]) -> Optional[Principal]:
+    """Principal for a decoded token, read through the cache.
+
+    Tokens issued before they carried ``sub`` are resolved by email once and
+    cached under the user id like any other.
+    """
+    user_id = _user_id(payload)
+    if user_id is None:
+        principal = _select_principal(db, User.email == payload.get("email"))
+        if principal is not None:
+            principal_cache.set(principal_key(principal.id), principal)
+        return principal
+    return principal_cache.get_or_load(
+        principal_key(user_id), lambda: _select_principal(db, User.id == user_id)
+    )
+
+
+async def load_principal_async(
+    db: AsyncSession, payload: Dict[str, Any]
+) -> Optional[Principal]:
+    """``load_principal`` on an AsyncSession."""
+    user_id = _user_id(payload)
+    if user_id is None:
+        principal = await _select_principal_async(
+            db, User.email == payload.get("email")
+        )
+        if principal is not None:
+            principal_cache.set(principal_key(principal.id), principal)
+        return principal
+    return await principal_cache.get_or_load_async(
+        principal_key(user_id), lambda: _select_principal_async(db, User.id == user_id)
+    )
+
+
+def invalidate_principal(*user_ids: int) -> None:
+    principal_cache.delete(*(principal_key(user_id) for user_id in user_ids))
@@ -0,0 +1,56 @@
+"""Query budgets for tests.
+
+    from utils.query_budget import query_budget
+
+    def test_blog_list_is_constant(client):
+        with query_budget(3, route="/blogs/"):
+            client.get("/blogs/?limit=50")
+
+Each request made inside the block, and any queries the block runs
+directly, must stay within ``max_queries`` statements or the block raises
+``AssertionError`` naming the offending route and its most repeated
+statements, so a new lazy load fails the suite instead of slipping in.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from utils.query_stats import QueryStats, current_query_stats, query_stats_observers
+
+
+def _describe(label: str, stats: QueryStats, max_queries: int) -> str:
+    lines = [f"{label} ran {stats.statements} queries, budget is {max_queries}:"]
+    for shape, count in stats.repeated(1)[:5]:
+        lines.append(f"  {count} x {shape[:200]}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def query_budget(
+    max_queries: int, route: Optional[str] = None
+) -> Iterator[List[Tuple[str, QueryStats]]]:
+    """Assert that no request (optionally only those to ``route``) exceeds
+    ``max_queries``; yields the (label, stats) recorded so far."""
+    recorded: List[Tuple[str, QueryStats]] = []
+    direct = QueryStats()
+
+    def observe(method: str, request_route: str, stats: QueryStats) -> None:
+        if route is None or request_route == route:
+            recorded.append((f"{method} {request_route}", stats))
+
+    query_stats_observers.append(observe)
+    token = current_query_stats.set(direct)
+    try:
+        yield recorded
+    finally:
+        current_query_stats.reset(token)
+        query_stats_observers.remove(observe)
+
+    if direct.statements:
+        recorded.append(("block", direct))
+    over = [
+        _describe(label, stats, max_queries)
+        for label, stats in recorded
+        if stats.statements > max_queries
+    ]
+    assert not over, "\n".join(over)
@@ -0,0 +1,131 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# adds Server-Timing and X-Query-Count to every response
+QUERY_STATS_HEADER = os.getenv("QUERY_STATS_HEADER", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# a statement shape run this often in one request is logged as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """``statement`` with IN lists of any length folded together."""
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_LIST.sub("(...)", statement)).strip()
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int = 2) -> List[tuple]:
+        """(shape, count) of statements run at least ``threshold`` times."""
+        counts = Counter()
+        for statement, count in self.shapes.items():
+            counts[statement_shape(statement)] += count
+        return [
+            (shape, count)
+            for shape, count in counts.most_common()
+            if count >= threshold
+        ]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+# called with (method, route, stats) after every request, e.g. by query_budget
+query_stats_observers: List[Callable[[str, str, QueryStats], None]] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+class QueryStatsMiddleware:
+    """Counts the SQL statements each HTTP request runs and how long they take.
+
+    Statement shapes repeated ``N_PLUS_ONE_THRESHOLD`` times or more are
+    logged as likely N+1 queries. With ``QUERY_STATS_HEADER`` the totals are
+    also returned in ``Server-Timing`` and ``X-Query-Count`` headers.
+    """
+
+    def __init__(self, app, header: bool = QUERY_STATS_HEADER):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        # outer middleware (metrics) reads the totals once the request is done
+        scope["query_stats"] = stats
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-query-count", str(stats.statements).encode()),
+                    (
+                        b"server-timing",
+                        f"db;dur={stats.db_seconds * 1000:.2f}".encode(),
+                    ),
+                ]
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_stats if self.header else send)
+        finally:
+            current_query_stats.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats) -> None:
+        method = scope["method"]
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        if stats.statements >= N_PLUS_ONE_THRESHOLD:
+            for shape, count in stats.repeated(N_PLUS_ONE_THRESHOLD):
+                logger.warning(
+                    "Likely N+1 in %s %s: %d x %s", method, route, count, shape[:300]
+                )
+        for observer in query_stats_observers:
+            observer(method, route, stats)
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from starlette.requests import HTTPConnection
+
+load_dotenv()
+
+REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", 5))
+PIN_COOKIE = "db_pin"
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass
+class RequestContext:
+    method: str
+    path: str
+    identity: str
+    # reads may be served by a replica
+    read_only: bool
+    scope: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route, e.g. /blogs/{blog_id}."""
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.path
+
+
+current_request: ContextVar[Optional[RequestContext]] = ContextVar(
+    "current_request", default=None
+)
+
+
+def request_identity(connection: HTTPConnection) -> str:
+    """Who is calling: their token if authenticated, else their address."""
+    token = connection.cookies.get("access_token") or connection.headers.get(
+        "authorization"
+    )
+    if token:
+        return "t:" + hashlib.sha256(token.encode()).hexdigest()[:32]
+    client = connection.client
+    return "a:" + (client.host if client else "unknown")
+
+
+class ReplicaPins:
+    """Identities that recently wrote, and so must read from the primary."""
+
+    def __init__(self, seconds: float = REPLICA_PIN_SECONDS, max_entries: int = 100000):
+        self.seconds = seconds
+        self.max_entries = max_entries
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def pin(self, identity: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {
+                    key: until for key, until in self._until.items() if until > now
+                }
+            self._until[identity] = now + self.seconds
+
+    def is_pinned(self, identity: str) -> bool:
+        until = self._until.get(identity)
+        return until is not None and until > time.monotonic()
+
+
+replica_pins = ReplicaPins()
+
+
+def _cookie_pinned(connection: HTTPConnection) -> bool:
+    # the cookie carries the pin across worker processes
+    try:
+        return float(connection.cookies.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class RequestContextMiddleware:
+    """Publishes a ``RequestContext`` for the duration of each HTTP request.
+
+    With ``pin_writes`` a successful mutating request pins its caller to the
+    primary for ``REPLICA_PIN_SECONDS``, in this process and through a cookie,
+    so the caller reads its own writes even if the replicas lag behind.
+    """
+
+    def __init__(self, app, pin_writes: bool = False):
+        self.app = app
+        self.pin_writes = pin_writes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        method = scope["method"]
+        identity = request_identity(connection)
+        read_only = method in READ_METHODS and not (
+            self.pin_writes
+            and (replica_pins.is_pinned(identity) or _cookie_pinned(connection))
+        )
+        context = RequestContext(method, scope["path"], identity, read_only, scope)
+
+        async def send_and_pin(message):
+            if (
+                message["type"] == "http.response.start"
+                and method not in READ_METHODS
+                and message["status"] < 400
+            ):
+                replica_pins.pin(identity)
+                cookie = (
+                    f"{PIN_COOKIE}={time.time() + replica_pins.seconds:.0f}; "
+                    f"Max-Age={replica_pins.seconds:.0f}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        token = current_request.set(context)
+        try:
+            await self.app(scope, receive, send_and_pin if self.pin_writes else send)
+        finally:
+            current_request.reset(token)
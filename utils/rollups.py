@@ -0,0 +1,315 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import (
+    DateTime,
+    String,
+    delete,
+    false,
+    func,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config.session import SessionLocal
+from models import (
+    Blog,
+    BlogLike,
+    Comment,
+    CommentLike,
+    FlaggedBlog,
+    FlaggedComment,
+    RollupWatermark,
+    StatsRollup,
+    User,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_INTERVAL_SECONDS = float(os.getenv("ROLLUP_INTERVAL_SECONDS", 60))
+ROLLUP_SETTLE_SECONDS = float(os.getenv("ROLLUP_SETTLE_SECONDS", 3600))
+# how often the job recounts everything, for rows that committed later than
+# ROLLUP_SETTLE_SECONDS after their hour
+ROLLUP_BACKFILL_SECONDS = float(os.getenv("ROLLUP_BACKFILL_SECONDS", 86400))
+# pg_try_advisory_xact_lock key held by the worker that is rolling up
+ROLLUP_LOCK_KEY = 0x726F6C6C7570
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# metric -> creation timestamp of the rows it counts
+ROLLUP_METRICS = {
+    "users": User.__table__.c.created_at,
+    "blogs": Blog.__table__.c.created_at,
+    "comments": Comment.__table__.c.created_at,
+    "blog_likes": BlogLike.c.created_at,
+    "comment_likes": CommentLike.c.created_at,
+    "flagged_blogs": FlaggedBlog.__table__.c.created_at,
+    "flagged_comments": FlaggedComment.__table__.c.created_at,
+}
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def floor_bucket(moment: datetime, step: timedelta = HOUR) -> datetime:
+    moment = as_utc(moment).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if step == DAY else moment
+
+
+def _hour_of(dialect: str, column):
+    if dialect == "sqlite":
+        # timestamps are stored as text; strftime also folds in any UTC offset
+        return type_coerce(func.strftime("%Y-%m-%d %H:00:00", column), DateTime())
+    return func.date_trunc("hour", func.timezone("UTC", column))
+
+
+def _created_since(dialect: str, column, moment: datetime):
+    if dialect == "sqlite":
+        # compare as text, in the CURRENT_TIMESTAMP format, so the created_at
+        # index still serves the range
+        return type_coerce(column, String) >= moment.strftime("%Y-%m-%d %H:%M:%S")
+    return column >= moment
+
+
+def _upsert(db: Session, table, rows: List[dict], keys: List[str], updates: List[str]):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(table)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"No upsert for the {dialect} dialect")
+    statement = statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: getattr(statement.excluded, column) for column in updates},
+    )
+    db.execute(statement, rows)
+
+
+def _claim_run(db: Session) -> bool:
+    """Make this transaction the only roll-up running, or report that one is.
+
+    Postgres uses a transaction-scoped advisory lock and lets a concurrent run
+    skip. SQLite has a single writer, so taking the write lock before counting
+    queues the other workers behind this run instead.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return db.execute(
+            select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY))
+        ).scalar_one()
+    db.execute(
+        update(RollupWatermark).where(false()).values(metric=RollupWatermark.metric)
+    )
+    return True
+
+
+def roll_up(
+    db: Session,
+    now: Optional[datetime] = None,
+    settle_seconds: float = ROLLUP_SETTLE_SECONDS,
+    full: bool = False,
+) -> int:
+    """Recount the hourly buckets that may still change and advance the watermarks.
+
+    Each metric is recounted from ``settle_seconds`` before its watermark and
+    those buckets are overwritten, not incremented, so a row that commits after
+    its hour was first rolled up (long transactions, clock skew between app
+    servers) is picked up by the next run without double counting. A metric
+    with no watermark, or every metric when ``full`` is set, is recounted from
+    its first row, which also catches rows that committed later than
+    ``settle_seconds``. Only one worker rolls up at a time; a run that finds
+    another one in progress writes nothing. Returns the number of buckets
+    written.
+    """
+    now = now or utcnow()
+    if not _claim_run(db):
+        db.rollback()
+        return 0
+    dialect = db.get_bind().dialect.name
+    watermarks = {
+        metric: rolled_until
+        for metric, rolled_until in db.execute(
+            select(RollupWatermark.metric, RollupWatermark.rolled_until)
+        )
+    }
+
+    written = 0
+    for metric, column in ROLLUP_METRICS.items():
+        hour = _hour_of(dialect, column).label("hour")
+        recount = select(hour, func.count()).where(column.is_not(None)).group_by(hour)
+        kept = select(StatsRollup.bucket_start).where(StatsRollup.metric == metric)
+
+        rolled_until = None if full else watermarks.get(metric)
+        if rolled_until is not None:
+            start = floor_bucket(
+                as_utc(rolled_until) - timedelta(seconds=settle_seconds)
+            )
+            recount = recount.where(_created_since(dialect, column, start))
+            kept = kept.where(StatsRollup.bucket_start >= start)
+
+        buckets = {as_utc(bucket): value for bucket, value in db.execute(recount)}
+        # buckets whose rows were all deleted since they were last counted
+        stale = {as_utc(bucket) for bucket in db.scalars(kept)} - buckets.keys()
+        if stale:
+            db.execute(
+                delete(StatsRollup).where(
+                    StatsRollup.metric == metric, StatsRollup.bucket_start.in_(stale)
+                )
+            )
+        if buckets:
+            _upsert(
+                db,
+                StatsRollup,
+                [
+                    {"metric": metric, "bucket_start": bucket, "value": value}
+                    for bucket, value in buckets.items()
+                ],
+                keys=["metric", "bucket_start"],
+                updates=["value"],
+            )
+        written += len(buckets)
+
+    _upsert(
+        db,
+        RollupWatermark,
+        [{"metric": metric, "rolled_until": now} for metric in ROLLUP_METRICS],
+        keys=["metric"],
+        updates=["rolled_until"],
+    )
+    db.commit()
+    return written
+
+
+def read_series(
+    db: Session, metric: str, start: datetime, end: datetime, step: timedelta
+) -> Tuple[List[Tuple[datetime, int]], Optional[datetime]]:
+    """Zero-filled ``[(bucket_start, value)]`` for ``[start, end)`` from the rollups.
+
+    Daily values are sums of the hourly buckets. Also returns the metric's
+    watermark, i.e. how current the series is.
+    """
+    first = floor_bucket(start, step)
+    rows = db.execute(
+        select(StatsRollup.bucket_start, StatsRollup.value).where(
+            StatsRollup.metric == metric,
+            StatsRollup.bucket_start >= first,
+            StatsRollup.bucket_start < end,
+        )
+    ).all()
+    totals = Counter()
+    for bucket, value in rows:
+        totals[floor_bucket(bucket, step)] += value
+
+    series = []
+    bucket = first
+    while bucket < end:
+        series.append((bucket, totals[bucket]))
+        bucket += step
+
+    rolled_until = db.execute(
+        select(RollupWatermark.rolled_until).where(RollupWatermark.metric == metric)
+    ).scalar_one_or_none()
+    return series, as_utc(rolled_until) if rolled_until else None
+
+
+class RollupJob:
+    """Background thread that runs ``roll_up`` every ``interval`` seconds."""
+
+    def __init__(self, interval: float = ROLLUP_INTERVAL_SECONDS):
+        self.interval = interval
+        self.runs = 0
+        self.failed_runs = 0
+        self.buckets_written = 0
+        self.last_run_seconds: Optional[float] = None
+        self.last_run_at: Optional[float] = None
+        self.backfills = 0
+        # the first run after start-up only recounts the settling window;
+        # metrics that were never rolled up are counted in full regardless
+        self._last_backfill = time.monotonic()
+        self._run_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        with self._run_lock:
+            started = time.perf_counter()
+            full = time.monotonic() - self._last_backfill >= ROLLUP_BACKFILL_SECONDS
+            try:
+                with SessionLocal() as db:
+                    written = roll_up(db, full=full)
+            except Exception:
+                self.failed_runs += 1
+                logger.exception("Rolling up platform stats failed")
+                return 0
+
+            self.runs += 1
+            if full:
+                self.backfills += 1
+                self._last_backfill = time.monotonic()
+            self.buckets_written += written
+            self.last_run_seconds = time.perf_counter() - started
+            self.last_run_at = time.time()
+            return written
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.run_once()
+            self._stopping.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stats-rollup", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "buckets_written": self.buckets_written,
+            "last_run_seconds": self.last_run_seconds,
+            "last_run_at": self.last_run_at,
+            "interval_seconds": self.interval,
+            "settle_seconds": ROLLUP_SETTLE_SECONDS,
+            "backfills": self.backfills,
+            "backfill_seconds": ROLLUP_BACKFILL_SECONDS,
+        }
+
+
+rollup_job = RollupJob()
+
+
+if __name__ == "__main__":
+    # python -m utils.rollups
+    with SessionLocal() as db:
+        written = roll_up(db, full=True)
+    print(f"Rolled up {written} hourly buckets from scratch.")
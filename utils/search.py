@@ -0,0 +1,92 @@
+import html
+from typing import Dict, List
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+from models import Blog
+from models.blog_search import blogs_fts, search_vector
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+# the database delimits matches with these private-use characters; the
+# fragment is HTML-escaped before they are swapped for the <mark> tags
+_MATCH_START = "\ue000"
+_MATCH_STOP = "\ue001"
+
+SUMMARY_COLUMNS = (
+    Blog.id,
+    Blog.title,
+    Blog.excerpt,
+    Blog.main_image_url,
+    Blog.created_at,
+    Blog.updated_at,
+    Blog.owner_id,
+    Blog.likes_count,
+)
+
+
+def _fts5_query(q: str) -> str:
+    # quote every term so user input can never be parsed as FTS5 syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def search_query(db: Session, q: str):
+    """Matching blogs with a ``rank`` column (higher is better) and the rank expression."""
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", q)
+        rank = func.ts_rank_cd(search_vector, tsquery)
+        query = db.query(*SUMMARY_COLUMNS, rank.label("rank")).filter(
+            search_vector.op("@@")(tsquery)
+        )
+        return query, rank
+
+    fts = literal_column("blogs_fts")
+    # bm25() is lower-is-better; negate it so both backends sort descending
+    rank = -func.bm25(fts, 10.0, 1.0)
+    query = (
+        db.query(*SUMMARY_COLUMNS, rank.label("rank"))
+        .select_from(blogs_fts)
+        .join(Blog, Blog.id == blogs_fts.c.rowid)
+        .filter(fts.op("MATCH")(_fts5_query(q)))
+    )
+    return query, rank
+
+
+def _highlight(fragment: str) -> str:
+    return (
+        html.escape(fragment)
+        .replace(_MATCH_START, SNIPPET_START)
+        .replace(_MATCH_STOP, SNIPPET_STOP)
+    )
+
+
+def search_snippets(db: Session, q: str, blog_ids: List[int]) -> Dict[int, str]:
+    """Highlighted fragments for one page of results only.
+
+    The content is HTML-escaped, so ``<mark>`` is the only markup a snippet
+    contains.
+    """
+    if not blog_ids:
+        return {}
+
+    if db.get_bind().dialect.name == "postgresql":
+        options = (
+            f"StartSel={_MATCH_START}, StopSel={_MATCH_STOP}, MaxWords=35, MinWords=15"
+        )
+        snippet = func.ts_headline(
+            "english", Blog.content, func.websearch_to_tsquery("english", q), options
+        )
+        rows = db.execute(select(Blog.id, snippet).where(Blog.id.in_(blog_ids)))
+    else:
+        fts = literal_column("blogs_fts")
+        snippet = func.snippet(fts, -1, _MATCH_START, _MATCH_STOP, "…", 24)
+        rows = db.execute(
+            select(blogs_fts.c.rowid, snippet)
+            .select_from(blogs_fts)
+            .where(fts.op("MATCH")(_fts5_query(q)), blogs_fts.c.rowid.in_(blog_ids))
+        )
+    return {
+        blog_id: _highlight(fragment) if fragment is not None else None
+        for blog_id, fragment in rows.all()
+    }
@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from utils.request_context import current_request
+
+logger = logging.getLogger(__name__)
+
+# statements worth explaining; DDL, PRAGMA, BEGIN and friends are not
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+# EXPLAINs waiting for the worker beyond this are dropped
+MAX_PENDING_EXPLAINS = 16
+
+
+def redact(parameters):
+    """Parameters with every string and bytes value reduced to its length.
+
+    Numbers, booleans, dates and NULLs are kept: they identify rows without
+    exposing passwords, tokens, emails or post bodies.
+    """
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if isinstance(parameters, str):
+        return f"<str:{len(parameters)}>"
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(parameters)}>"
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    if isinstance(parameters, datetime):
+        return parameters.isoformat()
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """Keeps the most recent statements slower than ``threshold_ms``.
+
+    Each one is logged with the route that ran it and its redacted
+    parameters, and its plan is captured by ``EXPLAIN`` (``EXPLAIN QUERY
+    PLAN`` on SQLite) on a single background thread, off the request path.
+    """
+
+    def __init__(self, threshold_ms: float, size: int = 100):
+        self.threshold_ms = threshold_ms
+        self.recorded = 0
+        self.explain_failures = 0
+        self._entries = deque(maxlen=size)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="slow-query-explain"
+        )
+
+    def install(self, engine, explain_engine=None) -> None:
+        """Time every statement on ``engine``; plans come from ``explain_engine``.
+
+        ``explain_engine`` must be a sync engine on the same schema, e.g. a
+        replica, so capturing plans never competes with the writer. Plans are
+        only captured when its driver takes the same placeholders as
+        ``engine``'s: asyncpg's ``$1`` statements cannot be replayed through
+        psycopg2, so they are logged without one.
+        """
+        if self.threshold_ms <= 0:
+            return
+        engine = getattr(engine, "sync_engine", engine)
+        explain_engine = explain_engine or engine
+        if explain_engine.dialect.paramstyle != engine.dialect.paramstyle:
+            explain_engine = None
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(
+            engine,
+            "after_cursor_execute",
+            lambda *args: self._after_execute(explain_engine, *args),
+        )
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info["slow_query_started"] = time.perf_counter()
+
+    def _after_execute(
+        self, explain_engine, conn, cursor, statement, parameters, context, executemany
+    ):
+        started = conn.info.pop("slow_query_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms or conn.get_execution_options().get(
+            "slow_query_explain"
+        ):
+            return
+
+        request = current_request.get()
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed_ms, 2),
+            "route": f"{request.method} {request.route}" if request else None,
+            "statement": statement,
+            "parameters": redact(parameters),
+            "executemany": executemany,
+            "plan": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        logger.warning(
+            "Slow query (%.0f ms) in %s: %s; parameters=%s",
+            elapsed_ms,
+            entry["route"] or "a background task",
+            " ".join(statement.split())[:500],
+            entry["parameters"],
+        )
+
+        if (
+            explain_engine is None
+            or executemany
+            or not statement.lstrip().lower().startswith(EXPLAINABLE)
+        ):
+            return
+        with self._lock:
+            if self._pending >= MAX_PENDING_EXPLAINS:
+                return
+            self._pending += 1
+        self._explainer.submit(
+            self._explain, explain_engine, entry, statement, parameters
+        )
+
+    def _explain(self, explain_engine, entry: dict, statement: str, parameters):
+        prefix = (
+            "EXPLAIN QUERY PLAN "
+            if explain_engine.dialect.name == "sqlite"
+            else "EXPLAIN "
+        )
+        try:
+            with explain_engine.connect() as conn:
+                rows = (
+                    conn.execution_options(slow_query_explain=True)
+                    .exec_driver_sql(prefix + statement, parameters)
+                    .all()
+                )
+            entry["plan"] = [" | ".join(str(value) for value in row) for row in rows]
+        except Exception as error:
+            self.explain_failures += 1
+            entry["plan"] = [f"EXPLAIN failed: {error}"]
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        """Newest first."""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        return entries[:limit] if limit else entries
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "recorded": self.recorded,
+            "buffered": len(self._entries),
+            "explain_failures": self.explain_failures,
+        }
+
+    def shutdown(self) -> None:
+        self._explainer.shutdown(wait=False, cancel_futures=True)
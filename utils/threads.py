@@ -0,0 +1,128 @@
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from models import Comment
+from utils.pagination import row_pivot
+
+NODE_COLUMNS = (
+    "id",
+    "content",
+    "created_at",
+    "updated_at",
+    "owner_id",
+    "parent_id",
+    "likes_count",
+)
+
+
+def thread_ids(db: Session, comment_id: int) -> List[int]:
+    """Ids of a comment and every reply below it, i.e. what a delete cascades to."""
+    thread = (
+        select(Comment.id)
+        .where(Comment.id == comment_id)
+        .cte("subtree", recursive=True)
+    )
+    thread = thread.union_all(
+        select(Comment.id).where(Comment.parent_id == thread.c.id)
+    )
+    return db.scalars(select(thread.c.id)).all()
+
+
+def blog_comment_ids(db: Session, blog_id: int) -> List[int]:
+    """Ids of every comment on a blog, i.e. what deleting the blog cascades to."""
+    return db.scalars(select(Comment.id).where(Comment.blog_id == blog_id)).all()
+
+
+def _thread_query(blog_id: int, depth: int, limit: int, after: Optional[List[Any]]):
+    columns = [getattr(Comment, name) for name in NODE_COLUMNS]
+    roots = select(
+        *columns,
+        func.row_number()
+        .over(order_by=(Comment.created_at, Comment.id))
+        .label("position"),
+    ).where(Comment.blog_id == blog_id, Comment.parent_id.is_(None))
+    if after is not None:
+        pivot = row_pivot(Comment.id, Comment.created_at)(after)
+        roots = roots.where(tuple_(Comment.created_at, Comment.id) > tuple_(*pivot))
+    # the limit has to apply to the seed alone, not to the recursive union
+    roots = roots.order_by(Comment.created_at, Comment.id).limit(limit + 1).subquery()
+
+    thread = select(roots, literal(1).label("depth")).cte("thread", recursive=True)
+    reply = aliased(Comment)
+    thread = thread.union_all(
+        select(
+            *[getattr(reply, name) for name in NODE_COLUMNS],
+            thread.c.position,
+            thread.c.depth + 1,
+        ).where(
+            reply.blog_id == blog_id,
+            reply.parent_id == thread.c.id,
+            thread.c.depth < depth,
+            thread.c.position <= limit,
+        )
+    )
+
+    child = aliased(Comment)
+    reply_count = (
+        select(func.count(child.id))
+        .where(child.blog_id == blog_id, child.parent_id == thread.c.id)
+        .scalar_subquery()
+    )
+    # parents sort before their replies, whatever the timestamps say
+    return select(
+        *[thread.c[name] for name in NODE_COLUMNS],
+        thread.c.position,
+        thread.c.depth,
+        reply_count.label("reply_count"),
+    ).order_by(thread.c.depth, thread.c.created_at, thread.c.id)
+
+
+def _assemble(rows, limit: int) -> Tuple[List[dict], bool]:
+    nodes = {}
+    top_level = []
+    has_more = False
+    for row in rows:
+        node = {**row._mapping, "replies": []}
+        if node.pop("position") > limit:
+            has_more = True
+            continue
+        nodes[node["id"]] = node
+        if node["depth"] == 1:
+            top_level.append(node)
+        else:
+            nodes[node["parent_id"]]["replies"].append(node)
+
+    return top_level, has_more
+
+
+def load_thread(
+    db: Session,
+    blog_id: int,
+    depth: int,
+    limit: int,
+    after: Optional[List[Any]] = None,
+) -> Tuple[List[dict], bool]:
+    """One page of top-level comments with their replies down to ``depth`` levels.
+
+    The whole page is fetched by a single recursive CTE seeded with the page's
+    roots plus one look-ahead root, which only tells whether there is another
+    page; its subtree is not fetched. Every node carries its total
+    ``reply_count`` so clients can tell where the tree was truncated.
+    """
+    rows = db.execute(_thread_query(blog_id, depth, limit, after)).all()
+    return _assemble(rows, limit)
+
+
+async def load_thread_async(
+    db: AsyncSession,
+    blog_id: int,
+    depth: int,
+    limit: int,
+    after: Optional[List[Any]] = None,
+) -> Tuple[List[dict], bool]:
+    """``load_thread`` on an AsyncSession."""
+    rows = (await db.execute(_thread_query(blog_id, depth, limit, after))).all()
+    return _assemble(rows, limit)
@@ -0,0 +1,106 @@
+import math
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+
+from config.session import SessionLocal
+from models import Blog, Comment
+from utils.cache import object_cache
+
+load_dotenv()
+
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 12))
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+VIEWER_WEIGHT = 0.1
+
+# keeps the creation term of the score small enough for float precision
+SCORE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def hot_score(
+    likes: int,
+    comments: int,
+    viewers: int,
+    created_at: datetime,
+    half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+) -> float:
+    """Log-scaled engagement plus a bonus that grows with the post's creation time.
+
+    A post created one half-life later needs half the engagement to rank the
+    same, which orders posts exactly like decaying every score by half per
+    half-life, but the stored value never has to change as time passes: only
+    new engagement moves it.
+    """
+    engagement = (
+        LIKE_WEIGHT * likes + COMMENT_WEIGHT * comments + VIEWER_WEIGHT * viewers
+    )
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (created_at - SCORE_EPOCH).total_seconds()
+    return math.log2(1 + engagement) + age / (half_life_hours * 3600)
+
+
+def refresh_hot_scores(
+    db: Session,
+    blog_ids: Optional[Iterable[int]] = None,
+    half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+) -> int:
+    """Recompute the stored score of ``blog_ids`` (every blog if None).
+
+    Only reads the counters of the given blogs, so callers refresh whatever
+    a like, comment or view flush just touched. The caller owns the
+    transaction. Returns the number of blogs updated.
+    """
+    blogs = Blog.__table__
+    comments = (
+        select(func.count())
+        .where(Comment.blog_id == blogs.c.id)
+        .correlate(blogs)
+        .scalar_subquery()
+    )
+    query = select(
+        blogs.c.id,
+        blogs.c.likes_count,
+        comments,
+        blogs.c.unique_viewers,
+        blogs.c.created_at,
+    )
+    if blog_ids is not None:
+        blog_ids = list(blog_ids)
+        if not blog_ids:
+            return 0
+        query = query.where(blogs.c.id.in_(blog_ids))
+
+    params = [
+        {
+            "b_id": blog_id,
+            "b_score": hot_score(
+                likes, comment_count, viewers, created_at, half_life_hours
+            ),
+        }
+        for blog_id, likes, comment_count, viewers, created_at in db.execute(query)
+        if created_at is not None
+    ]
+    if params:
+        db.execute(
+            blogs.update()
+            .where(blogs.c.id == bindparam("b_id"))
+            .values(hot_score=bindparam("b_score")),
+            params,
+        )
+    return len(params)
+
+
+if __name__ == "__main__":
+    # python -m utils.trending, e.g. after changing TRENDING_HALF_LIFE_HOURS
+    with SessionLocal() as db:
+        updated = refresh_hot_scores(db)
+        db.commit()
+    object_cache.clear()
+    print(f"Recomputed hot scores of {updated} blogs.")
@@ -1,39 +1,88 @@
 from fastapi import Request, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models import User
-from database import get_db
+from database import get_async_db, get_db
 from fastapi.security import OAuth2PasswordBearer
 from .hashing import decode_access_token
-from typing import List, Optional
+from models.role import Permission
+from .principal import Principal, load_principal, load_principal_async
+from typing import Optional
 
 oauth_scheme = OAuth2PasswordBearer(tokenUrl="")
+optional_oauth_scheme = OAuth2PasswordBearer(tokenUrl="", auto_error=False)
 
 
-def get_current_user(
-    request: Request, token: str = Depends(oauth_scheme), db: Session = Depends(get_db)
-):
+def _token_payload(request: Request, token: Optional[str]) -> dict:
     cookie_token = request.cookies.get("access_token")
     if cookie_token:
         token = cookie_token
 
-    payload = decode_access_token(token)
+    return decode_access_token(token)
+
+
+def _principal(db: Session, payload: dict) -> Principal:
+    principal = load_principal(db, payload)
+    if principal is None:
+        raise HTTPException(status_code=404, detail="No user found!")
+    return principal
+
+
+def get_current_user(
+    request: Request, token: str = Depends(oauth_scheme), db: Session = Depends(get_db)
+) -> Principal:
+    return _principal(db, _token_payload(request, token))
+
+
+def get_optional_user(
+    request: Request,
+    token: Optional[str] = Depends(optional_oauth_scheme),
+    db: Session = Depends(get_db),
+):
+    if not (request.cookies.get("access_token") or token):
+        return None
+    return get_current_user(request, token, db)
 
-    email = payload["email"]
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+async def get_optional_user_async(
+    request: Request,
+    token: Optional[str] = Depends(optional_oauth_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not (request.cookies.get("access_token") or token):
+        return None
+    principal = await load_principal_async(db, _token_payload(request, token))
+    if principal is None:
         raise HTTPException(status_code=404, detail="No user found!")
+    return principal
+
 
-    return user
+def _require_permission(current_user: Principal, permission: Permission):
+    if permission not in current_user.permissions:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
+    return current_user
+
+
+def _require_role(current_user: Principal, allowed_role):
+    if current_user.role_name not in allowed_role:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
+    return current_user
+
+
+def allowed_permission(permission: Permission):
+    # sync like the other guards: a registry refresh queries the database
+    def permission_checking(current_user=Depends(get_current_user)):
+        return _require_permission(current_user, permission)
+
+    return permission_checking
 
 
 def allowed_role(*allowed_role: str):
-    async def role_checking(current_user=Depends(get_current_user)):
-        if current_user.role.role_name not in allowed_role:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
-            )
-        return current_user
+    def role_checking(current_user=Depends(get_current_user)):
+        return _require_role(current_user, allowed_role)
 
     return role_checking
 
@@ -41,9 +90,8 @@ def allowed_role(*allowed_role: str):
 def allow_blog_owner_or_roles(
     get_resource_function,
     owner_attribute: str = "owner_id",
-    allowed_roles: Optional[List[str]] = None,
+    permission: Optional[Permission] = None,
 ):
-    allowed_roles = allowed_roles or []
 
     def inner_dependency_function(
         blog_id: int,
@@ -60,7 +108,7 @@ def allow_blog_owner_or_roles(
         owner_id = getattr(resource, owner_attribute)
         if owner_id == current_user.id:
             return resource
-        if current_user.role in allowed_roles:
+        if permission is not None and permission in current_user.permissions:
             return resource
 
         raise HTTPException(
@@ -74,9 +122,8 @@ def allow_blog_owner_or_roles(
 def allow_comment_owner_or_roles(
     get_resource_function,
     owner_attribute: str = "owner_id",
-    allowed_roles: Optional[List[str]] = None,
+    permission: Optional[Permission] = None,
 ):
-    allowed_roles = allowed_roles or []
 
     def inner_dependency_function(
         comment_id: int,
@@ -93,7 +140,7 @@ def allow_comment_owner_or_roles(
         owner_id = getattr(resource, owner_attribute)
         if owner_id == current_user.id:
             return resource
-        if current_user.role in allowed_roles:
+        if permission is not None and permission in current_user.permissions:
             return resource
 
         raise HTTPException(